@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+
+USER_CACHE_KEY = "auth_user:{}"
+
+
+def get_user_cache_timeout() -> int:
+    return getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+
+
+def get_cached_user(request):
+    """
+    Возвращает пользователя сессии, как django.contrib.auth.get_user, но
+    сначала ищет его в кеше. Проверки бэкенда и хеша сессии выполняются
+    и для пользователя из кеша, поэтому смена пароля завершает сессии
+    так же, как без кеша.
+    """
+    user_id = request.session.get(auth.SESSION_KEY)
+    backend_path = request.session.get(auth.BACKEND_SESSION_KEY)
+    if user_id is None or backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, get_user_cache_timeout())
+        return user
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (
+        session_hash
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        # Пусть django сам сбросит сессию с устаревшим хешем.
+        return auth.get_user(request)
+    user.backend = backend_path
+    return user
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    cache.delete(USER_CACHE_KEY.format(instance.pk))
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+from .ratelimit import get_rate_limit
+
+
+@register()
+def check_rate_limits(app_configs, **kwargs):
+    """
+    Проверяет настройки RATE_LIMITS: корзина с нулевой скоростью
+    пополнения никогда не наполнится, а время Retry-After для нее делится
+    на ноль.
+    """
+    errors = []
+    for scope in getattr(settings, "RATE_LIMITS", {}):
+        for kind, limit in get_rate_limit(scope).items():
+            if not limit:
+                continue
+            if limit["refill_per_second"] <= 0 or limit["capacity"] < 1:
+                errors.append(Error(
+                    f"RATE_LIMITS[{scope!r}][{kind!r}]: refill_per_second "
+                    f"must be positive and capacity at least 1.",
+                    id="core.E001",
+                ))
+    return errors
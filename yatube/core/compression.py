@@ -0,0 +1,56 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def available_encodings():
+    """Алгоритмы сжатия в порядке предпочтения."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def accepted_encodings(request):
+    """
+    Алгоритмы из заголовка Accept-Encoding. Алгоритмы с q=0 клиент явно
+    запрещает, они не возвращаются.
+    """
+    header = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    accepted = set()
+    for value in header.split(","):
+        encoding, *params = value.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(number)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def negotiate_encoding(request, encodings=None):
+    """
+    Выбирает первый алгоритм из encodings, который поддерживает клиент.
+    """
+    if encodings is None:
+        encodings = available_encodings()
+    accepted = accepted_encodings(request)
+    for encoding in encodings:
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def compress(content: bytes, encoding: str, level: int) -> bytes:
+    """
+    Сжимает данные указанным алгоритмом. level - уровень gzip (1-9) или
+    качество brotli (0-11).
+    """
+    if encoding == "br":
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, compresslevel=level, mtime=0)
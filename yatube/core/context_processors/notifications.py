@@ -0,0 +1,19 @@
+from django.utils.functional import SimpleLazyObject
+
+from posts.notifications import get_unread_count
+
+
+def unread_notifications(request):
+    """
+    Число непрочитанных уведомлений для шапки. Вычисляется лениво и
+    берется из кеша, поэтому страница без шапки или повторный показ
+    шапки не делают запросов к базе.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        "unread_notifications": SimpleLazyObject(
+            lambda: get_unread_count(user.pk)
+        ),
+    }
@@ -0,0 +1,7 @@
+from django.utils.decorators import decorator_from_middleware
+
+from .middleware import CompressionMiddleware
+
+# Сжимает ответ view-функции. Если декоратор стоит под cache_page, в кеш
+# попадает уже сжатая страница, и повторные запросы не сжимаются заново.
+compress_page = decorator_from_middleware(CompressionMiddleware)
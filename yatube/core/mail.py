@@ -0,0 +1,102 @@
+import email
+from email.generator import BytesGenerator
+from email.message import Message
+from io import BytesIO
+from typing import List
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Почтовый бэкенд, который не отправляет письма, а сохраняет их в таблицу
+    OutboxMessage. Отправляет их команда send_queued_mail через бэкенд
+    OUTBOX_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        messages = [
+            OutboxMessage(
+                from_email=message.from_email,
+                recipients="\n".join(message.recipients()),
+                message=message.message().as_bytes(),
+            )
+            for message in email_messages if message.recipients()
+        ]
+        OutboxMessage.objects.bulk_create(messages)
+        return len(messages)
+
+
+class StoredMIMEMessage(Message):
+    """
+    MIME-письмо, разобранное из очереди. Как и письма django, умеет
+    сериализоваться с заданным разделителем строк.
+    """
+
+    def as_bytes(self, unixfrom=False, linesep="\n"):
+        fp = BytesIO()
+        generator = BytesGenerator(fp, mangle_from_=False)
+        generator.flatten(self, unixfrom=unixfrom, linesep=linesep)
+        return fp.getvalue()
+
+
+class QueuedEmailMessage(EmailMessage):
+    """Письмо из очереди, уже собранное в MIME при постановке в очередь."""
+
+    def __init__(self, outbox_message: OutboxMessage):
+        super().__init__(from_email=outbox_message.from_email)
+        self.outbox_message = outbox_message
+
+    def message(self):
+        return email.message_from_bytes(
+            bytes(self.outbox_message.message), _class=StoredMIMEMessage
+        )
+
+    def recipients(self) -> List[str]:
+        return self.outbox_message.recipients.splitlines()
+
+
+def send_queued_mail(batch_size: int = 100, max_attempts: int = 5) -> tuple:
+    """
+    Отправляет до batch_size писем из очереди через одно соединение.
+    Возвращает количество отправленных писем и писем с ошибкой.
+    Рассчитана на одного обработчика очереди.
+    """
+    batch = list(
+        OutboxMessage.objects.filter(sent=None, attempts__lt=max_attempts)
+        [:batch_size]
+    )
+    if not batch:
+        return 0, 0
+    sent = failed = 0
+    connection = get_connection(settings.OUTBOX_EMAIL_BACKEND)
+    # Открытое заранее соединение send_messages не закрывает, поэтому все
+    # письма пакета уходят через него.
+    connection.open()
+    try:
+        for outbox_message in batch:
+            outbox_message.attempts += 1
+            try:
+                connection.send_messages(
+                    [QueuedEmailMessage(outbox_message)]
+                )
+            except Exception as error:
+                outbox_message.last_error = str(error)
+                failed += 1
+            else:
+                outbox_message.sent = timezone.now()
+                outbox_message.last_error = ""
+                sent += 1
+    finally:
+        connection.close()
+        with transaction.atomic():
+            OutboxMessage.objects.bulk_update(
+                batch, ("attempts", "sent", "last_error")
+            )
+    return sent, failed
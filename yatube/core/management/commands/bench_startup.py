@@ -0,0 +1,87 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Выполняется в новом процессе интерпретатора: время импорта WSGI-модуля
+# и двух первых запросов, в миллисекундах.
+PROBE = """
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from yatube.wsgi import application
+timings = {"import": time.perf_counter() - started}
+
+
+def request(path):
+    environ = {"PATH_INFO": path}
+    setup_testing_defaults(environ)
+    statuses = []
+
+    def start_response(status, headers):
+        statuses.append(status)
+
+    started = time.perf_counter()
+    body = application(environ, start_response)
+    for chunk in body:
+        pass
+    if hasattr(body, "close"):
+        body.close()
+    return time.perf_counter() - started, statuses[0]
+
+
+timings["first request"], status = request(sys.argv[1])
+timings["second request"], _ = request(sys.argv[1])
+print(json.dumps({
+    "status": status,
+    "timings": {name: value * 1000 for name, value in timings.items()},
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет холодный старт: время импорта yatube.wsgi и первых "
+        "запросов в новых процессах интерпретатора."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/")
+        parser.add_argument(
+            "--settings-module", default=settings.SETTINGS_MODULE,
+            help="Модуль настроек, например yatube.production_settings."
+        )
+
+    def handle(self, *args, runs, path, settings_module, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+        results = []
+        for _ in range(runs):
+            process = subprocess.run(
+                (sys.executable, "-c", PROBE, path),
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+            )
+            if process.returncode:
+                raise CommandError(process.stderr.strip())
+            results.append(json.loads(process.stdout.splitlines()[-1]))
+
+        self.stdout.write(
+            f"{settings_module}, {path} -> {results[0]['status']}, "
+            f"runs: {runs}"
+        )
+        self.stdout.write(f"{'phase':<16}{'median ms':>12}{'max ms':>10}")
+        for phase in results[0]["timings"]:
+            values = [result["timings"][phase] for result in results]
+            self.stdout.write(
+                f"{phase:<16}{statistics.median(values):>12.1f}"
+                f"{max(values):>10.1f}"
+            )
@@ -0,0 +1,111 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import Client, override_settings, utils
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Измеряет задержку чтения страницы поста, пока один пользователь "
+        "заваливает базу комментариями, с ограничением частоты записи и "
+        "без него. Работает на временной базе данных."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--readers", type=int, default=2)
+        parser.add_argument("--writers", type=int, default=4)
+
+    def handle(self, *args, **options):
+        db_dir = tempfile.mkdtemp()
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        test_settings["NAME"] = os.path.join(db_dir, "bench.sqlite3")
+        utils.setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            with override_settings(DEBUG=False):
+                self._run(**options)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            utils.teardown_test_environment()
+
+    def _run(self, duration, readers, writers, **options):
+        reader_user = User.objects.create_user(username="bench_reader")
+        flooder = User.objects.create_user(username="bench_flooder")
+        post = Post.objects.create(text="Benchmark post", author=flooder)
+        phases = (
+            ("baseline", 0, True),
+            ("flood, no limit", writers, False),
+            ("flood, rate limited", writers, True),
+        )
+        self.stdout.write(
+            f"{'phase':<22}{'reads':>8}{'writes':>8}{'rejected':>10}"
+            f"{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        )
+        for name, writer_count, enabled in phases:
+            cache.clear()
+            post.comments.all().delete()
+            with override_settings(RATE_LIMIT_ENABLED=enabled):
+                result = self._phase(
+                    post, reader_user, flooder, duration,
+                    readers, writer_count,
+                )
+            latencies = sorted(result["latencies"]) or [0]
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            self.stdout.write(
+                f"{name:<22}{len(result['latencies']):>8}"
+                f"{result['writes']:>8}{result['rejected']:>10}"
+                f"{statistics.median(latencies) * 1000:>10.1f}"
+                f"{p95 * 1000:>10.1f}{latencies[-1] * 1000:>10.1f}"
+            )
+
+    def _phase(self, post, reader_user, flooder, duration, readers, writers):
+        deadline = time.monotonic() + duration
+        lock = threading.Lock()
+        result = {"latencies": [], "writes": 0, "rejected": 0}
+        detail_url = reverse("posts:post_detail", args=(post.pk,))
+        comment_url = reverse("posts:add_comment", args=(post.pk,))
+
+        def read():
+            client = Client()
+            client.force_login(reader_user)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                client.get(detail_url)
+                elapsed = time.perf_counter() - started
+                with lock:
+                    result["latencies"].append(elapsed)
+            connection.close()
+
+        def write():
+            client = Client()
+            client.force_login(flooder)
+            while time.monotonic() < deadline:
+                response = client.post(comment_url, data={"text": "flood"})
+                with lock:
+                    if response.status_code == 429:
+                        result["rejected"] += 1
+                    else:
+                        result["writes"] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=read) for _ in range(readers)]
+        threads += [threading.Thread(target=write) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return result
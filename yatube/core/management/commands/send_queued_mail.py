@@ -0,0 +1,50 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import send_queued_mail
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Отправляет письма из очереди OutboxMessage пакетами, каждый пакет "
+        "через одно соединение. С --loop работает как постоянный "
+        "обработчик очереди."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--max-attempts", type=int, default=5)
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Пауза в секундах, когда очередь пуста."
+        )
+
+    def handle(self, *args, batch_size, max_attempts, loop, interval,
+               **options):
+        total_sent = total_failed = 0
+        while True:
+            try:
+                sent, failed = send_queued_mail(batch_size, max_attempts)
+            except Exception:
+                if not loop:
+                    raise
+                # Например, почтовый сервер недоступен: постоянный
+                # обработчик не завершается, а повторяет попытку позже.
+                logger.exception("Не удалось отправить письма из очереди")
+                time.sleep(interval)
+                continue
+            total_sent += sent
+            total_failed += failed
+            if sent == batch_size:
+                continue
+            if not loop:
+                break
+            time.sleep(interval)
+        self.stdout.write(
+            f"Отправлено писем: {total_sent}, с ошибкой: {total_failed}"
+        )
@@ -0,0 +1,130 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+
+from .auth import get_cached_user
+from .compression import compress, negotiate_encoding
+from .storage import SUFFIXES
+
+# Имя файла с хешем содержимого, которое добавляет ManifestStaticFilesStorage.
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{12}\.[^/]+$")
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Отдает файлы из STATIC_ROOT, выбирая заранее сжатую версию файла по
+    заголовку Accept-Encoding. Файлы с хешем в имени кешируются браузером
+    на год как неизменяемые. При DEBUG отключается: статику тогда отдает
+    runserver из исходных каталогов.
+    """
+
+    def __init__(self, get_response):
+        if settings.DEBUG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.serve(request)
+        if response is None:
+            response = self.get_response(request)
+        return response
+
+    def serve(self, request):
+        static_root = settings.STATIC_ROOT
+        if (
+            not static_root
+            or request.method not in ("GET", "HEAD")
+            or not request.path.startswith(settings.STATIC_URL)
+        ):
+            return None
+        name = request.path[len(settings.STATIC_URL):]
+        try:
+            path = safe_join(static_root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content_type, _ = mimetypes.guess_type(path)
+        encoding = negotiate_encoding(request, [
+            encoding for encoding, suffix in SUFFIXES.items()
+            if os.path.isfile(path + suffix)
+        ])
+        if encoding:
+            path += SUFFIXES[encoding]
+
+        response = FileResponse(
+            open(path, "rb"),
+            content_type=content_type or "application/octet-stream",
+        )
+        if encoding:
+            response["Content-Encoding"] = encoding
+        patch_vary_headers(response, ("Accept-Encoding",))
+        response["Last-Modified"] = http_date(os.stat(path).st_mtime)
+        if HASHED_NAME_RE.search(name):
+            response["Cache-Control"] = (
+                f"public, max-age={settings.STATIC_MAX_AGE}, immutable"
+            )
+        else:
+            response["Cache-Control"] = "public, max-age=60"
+        return response
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает HTML и JSON ответы алгоритмом brotli (если он установлен) или
+    gzip. Уже сжатые ответы, например из кеша страниц, не трогает.
+    CSRF-токен Django маскирует заново в каждом ответе, поэтому подобрать
+    его по размеру сжатого ответа (атака BREACH) нельзя.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0]
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or content_type not in settings.COMPRESSIBLE_CONTENT_TYPES
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = negotiate_encoding(request)
+        if encoding is None:
+            return response
+
+        level = (
+            settings.COMPRESSION_BROTLI_QUALITY if encoding == "br"
+            else settings.COMPRESSION_GZIP_LEVEL
+        )
+        compressed_content = compress(response.content, encoding, level)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response["Content-Length"] = str(len(response.content))
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Замена AuthenticationMiddleware, которая берет пользователя сессии из
+    кеша на AUTH_USER_CACHE_TIMEOUT секунд, см. core.auth.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
@@ -0,0 +1,54 @@
+from django.db import models
+
+
+class StoredFile(models.Model):
+    """Число ссылок на файл в ContentAddressedStorage."""
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name="Имя файла",
+    )
+    refcount = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Число ссылок",
+    )
+
+    class Meta:
+        verbose_name = "Stored file"
+        verbose_name_plural = "Stored files"
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class OutboxMessage(models.Model):
+    """Письмо, ожидающее отправки командой send_queued_mail."""
+    from_email = models.TextField(verbose_name="Отправитель")
+    recipients = models.TextField(
+        verbose_name="Получатели",
+        help_text="По одному адресу в строке.",
+    )
+    message = models.BinaryField(verbose_name="Письмо в формате MIME")
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата постановки в очередь",
+    )
+    sent = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        verbose_name="Дата отправки",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Число попыток",
+    )
+    last_error = models.TextField(blank=True, verbose_name="Последняя ошибка")
+
+    class Meta:
+        ordering = ("pk",)
+        verbose_name = "Outbox message"
+        verbose_name_plural = "Outbox messages"
+
+    def __str__(self):
+        return ", ".join(self.recipients.splitlines())
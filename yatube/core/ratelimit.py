@@ -0,0 +1,157 @@
+import math
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+# Блокировка корзин: сколько ждать ее и через сколько секунд она
+# снимается сама, если процесс упал, не освободив ее.
+LOCK_WAIT = 0.05
+LOCK_POLL_INTERVAL = 0.005
+LOCK_TIMEOUT = 1
+
+DEFAULT_RATE_LIMIT = {
+    "user": {"capacity": 10, "refill_per_second": 0.2},
+    "ip": {"capacity": 100, "refill_per_second": 2},
+}
+
+
+def get_rate_limit(scope: str) -> dict:
+    """Возвращает настройки корзин маркеров для указанного endpoint'а."""
+    return {
+        **DEFAULT_RATE_LIMIT,
+        **getattr(settings, "RATE_LIMITS", {}).get(scope, {}),
+    }
+
+
+class TokenBucket:
+    """
+    Корзина маркеров, состояние которой хранится в кеше: пара
+    (количество маркеров, время последнего пополнения).
+    """
+
+    def __init__(self, key, capacity, refill_per_second):
+        self.key = key
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+
+    def tokens(self, state, now) -> float:
+        """Количество маркеров на момент now по состоянию из кеша."""
+        tokens, updated = state or (self.capacity, now)
+        elapsed = max(now - updated, 0)
+        return min(self.capacity, tokens + elapsed * self.refill_per_second)
+
+    def wait(self, tokens) -> float:
+        """Секунды до появления маркера, 0 - маркер есть."""
+        if tokens >= 1:
+            return 0
+        return (1 - tokens) / self.refill_per_second
+
+    def timeout(self) -> int:
+        """Время, за которое корзина наполняется целиком."""
+        return math.ceil(self.capacity / self.refill_per_second)
+
+
+@contextmanager
+def lock_buckets(buckets):
+    """
+    Блокирует корзины на время чтения и записи: cache.add атомарен, поэтому
+    параллельные запросы не потратят один маркер дважды. Если блокировку
+    не удалось получить за LOCK_WAIT секунд, запрос проходит проверку
+    без нее - ограничение частоты не должно останавливать сайт.
+    """
+    lock_keys = sorted(f"{bucket.key}:lock" for bucket in buckets)
+    deadline = time.monotonic() + LOCK_WAIT
+    acquired = []
+    for key in lock_keys:
+        while not cache.add(key, 1, LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(LOCK_POLL_INTERVAL)
+        else:
+            acquired.append(key)
+    try:
+        yield
+    finally:
+        cache.delete_many(acquired)
+
+
+def consume(buckets, now=None) -> float:
+    """
+    Забирает по маркеру из каждой корзины, только если маркер есть во
+    всех. Возвращает 0, если маркеры получены, иначе - количество секунд
+    до появления маркера в самой пустой корзине; тогда корзины не
+    меняются.
+    """
+    now = time.time() if now is None else now
+    with lock_buckets(buckets):
+        states = cache.get_many([bucket.key for bucket in buckets])
+        tokens = [bucket.tokens(states.get(bucket.key), now)
+                  for bucket in buckets]
+        retry_after = max(
+            [bucket.wait(count) for bucket, count in zip(buckets, tokens)],
+            default=0,
+        )
+        if retry_after:
+            return retry_after
+        for bucket, count in zip(buckets, tokens):
+            cache.set(bucket.key, (count - 1, now), bucket.timeout())
+    return 0
+
+
+def get_client_ip(request) -> str:
+    """
+    Адрес клиента. За фронт-прокси REMOTE_ADDR - адрес прокси, поэтому
+    адрес берется из заголовка RATE_LIMIT_CLIENT_IP_HEADER, который
+    выставляет прокси. Из списка X-Forwarded-For берется последний
+    адрес - его добавил наш прокси, а предыдущие мог подставить клиент.
+    """
+    header = getattr(settings, "RATE_LIMIT_CLIENT_IP_HEADER", None)
+    if header:
+        forwarded = request.META.get(header, "").split(",")[-1].strip()
+        if forwarded:
+            return forwarded
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def get_buckets(request, scope):
+    limits = get_rate_limit(scope)
+    identities = {"ip": get_client_ip(request)}
+    if request.user.is_authenticated:
+        identities["user"] = request.user.pk
+    return [
+        TokenBucket(
+            f"ratelimit:{scope}:{kind}:{identity}", **limits[kind]
+        )
+        for kind, identity in identities.items()
+        if limits.get(kind)
+    ]
+
+
+def rate_limit(scope, methods=("POST",)):
+    """
+    Ограничивает частоту запросов к view-функции отдельно для пользователя
+    и для IP-адреса. При превышении лимита возвращает ответ 429 с
+    заголовком Retry-After.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            limited = (
+                getattr(settings, "RATE_LIMIT_ENABLED", True)
+                and (methods is None or request.method in methods)
+            )
+            if limited:
+                retry_after = consume(get_buckets(request, scope))
+                if retry_after:
+                    response = render(
+                        request, "core/429.html", status=429
+                    )
+                    response["Retry-After"] = str(math.ceil(retry_after))
+                    return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
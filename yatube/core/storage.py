@@ -0,0 +1,163 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+from .compression import available_encodings, compress
+
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+MAX_LEVELS = {"br": 11, "gzip": 9}
+
+COMPRESSIBLE_EXTENSIONS = (
+    ".css", ".js", ".svg", ".ico", ".txt", ".json", ".xml", ".map", ".html",
+)
+
+
+def compress_variants(content: bytes):
+    """
+    Возвращает пары (расширение, сжатые данные) для всех доступных
+    алгоритмов, если сжатие уменьшает размер.
+    """
+    variants = [
+        (SUFFIXES[encoding], compress(content, encoding, MAX_LEVELS[encoding]))
+        for encoding in available_encodings()
+    ]
+    return [
+        (suffix, data) for suffix, data in variants if len(data) < len(content)
+    ]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хешами в именах файлов, которое при collectstatic
+    дополнительно записывает рядом с каждым файлом его .gz и .br версии.
+    """
+
+    def post_process(self, *args, **kwargs):
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get("dry_run"):
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._write_compressed(name)
+
+    def _write_compressed(self, name):
+        with self.open(name) as original:
+            content = original.read()
+        for suffix, data in compress_variants(content):
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(data))
+
+
+def content_address(name: str, content) -> str:
+    """
+    Возвращает имя файла по SHA-256 его содержимого внутри каталога из
+    name, разложенное по двум уровням подкаталогов: posts/ab/cd/abcd...gif.
+    """
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    hexdigest = digest.hexdigest()
+    extension = posixpath.splitext(name)[1].lower()
+    return posixpath.join(
+        posixpath.dirname(name),
+        hexdigest[:2],
+        hexdigest[2:4],
+        hexdigest + extension,
+    )
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Файловое хранилище, в котором имя файла определяется его содержимым.
+    Одинаковые файлы хранятся один раз, число ссылок на файл хранится в
+    модели StoredFile; файл удаляется, когда ссылок не остается.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя все равно заменяется на адрес содержимого в _save().
+        return name
+
+    def _save(self, name, content):
+        from .models import StoredFile
+
+        name = content_address(name, content)
+        while True:
+            with transaction.atomic():
+                StoredFile.objects.get_or_create(name=name)
+                # Блокировка строки не дает delete() удалить файл, пока
+                # сохраняется новая ссылка на него.
+                stored_file = StoredFile.objects.select_for_update().filter(
+                    name=name
+                ).first()
+                if stored_file is None:
+                    # Строку удалил delete() между двумя запросами.
+                    continue
+                self._write_once(name, content)
+                StoredFile.objects.filter(pk=stored_file.pk).update(
+                    refcount=F("refcount") + 1
+                )
+            return name
+
+    def _write_once(self, name, content):
+        """
+        Записывает файл, если его еще нет. Файл появляется под своим именем
+        только целиком, а FileExistsError означает, что такое же
+        содержимое уже сохранено.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, exist_ok=True)
+        try:
+            if hasattr(content, "temporary_file_path"):
+                file_move_safe(content.temporary_file_path(), full_path)
+            else:
+                self._write_new(full_path, content)
+        except FileExistsError:
+            return
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+
+    def _write_new(self, full_path, content):
+        descriptor, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(full_path), suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    file.write(chunk)
+            # В отличие от переименования, link() не перезаписывает файл.
+            os.link(tmp_path, full_path)
+        finally:
+            os.unlink(tmp_path)
+
+    def delete(self, name):
+        from .models import StoredFile
+
+        with transaction.atomic():
+            stored_file = StoredFile.objects.select_for_update().filter(
+                name=name
+            ).first()
+            # Файлы, сохраненные до появления подсчета ссылок, не удаляем.
+            if stored_file is None:
+                return
+            StoredFile.objects.filter(
+                pk=stored_file.pk, refcount__gt=0
+            ).update(refcount=F("refcount") - 1)
+            stored_file.refresh_from_db(fields=["refcount"])
+            if stored_file.refcount > 0:
+                return
+            stored_file.delete()
+            super().delete(name)
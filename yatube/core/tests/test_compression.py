@@ -0,0 +1,99 @@
+import gzip
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..compression import brotli, compress
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.post = Post.objects.create(
+            text="Тестовый пост для проверки сжатия", author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_html_is_gzipped(self):
+        """Проверяем, что HTML-страница сжимается gzip."""
+        response = self.client.get(
+            reverse("posts:post_detail", args=(self.post.pk,)),
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn(
+            self.post.text.encode(), gzip.decompress(response.content)
+        )
+
+    def test_brotli_is_preferred(self):
+        """Проверяем, что brotli предпочтительнее gzip, если установлен."""
+        if brotli is None:
+            self.skipTest("Brotli is not installed")
+        response = self.client.get(
+            reverse("posts:post_detail", args=(self.post.pk,)),
+            HTTP_ACCEPT_ENCODING="gzip, br",
+        )
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn(
+            self.post.text.encode(), brotli.decompress(response.content)
+        )
+
+    @override_settings(COMPRESSION_MIN_SIZE=10 ** 9)
+    def test_small_response_is_not_compressed(self):
+        """Проверяем, что ответы меньше минимального размера не сжимаются."""
+        response = self.client.get(
+            reverse("posts:post_detail", args=(self.post.pk,)),
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_cached_index_page_is_compressed_once(self):
+        """
+        Проверяем, что сжатая главная страница берется из кеша и не
+        сжимается повторно.
+        """
+        url = reverse("posts:index")
+        with mock.patch(
+            "core.middleware.compress", side_effect=compress
+        ) as patched_compress:
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            second = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(patched_compress.call_count, 1)
+        self.assertEqual(second["Content-Encoding"], "gzip")
+        self.assertEqual(first.content, second.content)
+
+    def test_pages_of_logged_in_user_are_compressed(self):
+        """
+        Проверяем, что страницы пользователя с сессией и CSRF-токеном
+        тоже сжимаются.
+        """
+        self.client.force_login(self.user)
+        for url in (
+            reverse("posts:post_detail", args=(self.post.pk,)),
+            reverse("posts:index"),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+                self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_accept_encoding_is_not_rewritten(self):
+        """Проверяем, что заголовок Accept-Encoding запроса не меняется."""
+        response = self.client.get(
+            reverse("posts:index"), HTTP_ACCEPT_ENCODING="gzip, deflate"
+        )
+        self.assertEqual(
+            response.wsgi_request.META["HTTP_ACCEPT_ENCODING"],
+            "gzip, deflate",
+        )
@@ -0,0 +1,164 @@
+import smtplib
+import socketserver
+import threading
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import OutboxMessage
+
+User = get_user_model()
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и запоминает их."""
+
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost")
+        for line in self.rfile:
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in self.rfile:
+                    if data_line == b".\r\n":
+                        break
+                    data.append(data_line)
+                self.server.messages.append(b"".join(data))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("250 OK")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeSMTPHandler)
+        self.connections = 0
+        self.messages = []
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPException("SMTP is down")
+
+
+class UnreachableEmailBackend(BaseEmailBackend):
+    open_calls = 0
+
+    def open(self):
+        UnreachableEmailBackend.open_calls += 1
+        raise ConnectionRefusedError("Connection refused")
+
+    def send_messages(self, email_messages):
+        return 0
+
+
+class StopLoop(BaseException):
+    """Останавливает бесконечный цикл команды в тесте."""
+
+
+@override_settings(EMAIL_BACKEND="core.mail.OutboxEmailBackend")
+class OutboxMailTest(TestCase):
+    def setUp(self):
+        self.server = FakeSMTPServer()
+        threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}
+        ).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def send_queued_mail(self, **options):
+        with self.settings(
+            OUTBOX_EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=self.server.server_address[1],
+        ):
+            call_command("send_queued_mail", stdout=StringIO(), **options)
+
+    def test_password_reset_mail_is_queued(self):
+        """
+        Проверяем, что письмо для сброса пароля ставится в очередь, а не
+        отправляется во время запроса.
+        """
+        User.objects.create_user(
+            username="auth_user", email="user@test.ru", password="password"
+        )
+        self.client.post(
+            reverse("users:password_reset"), {"email": "user@test.ru"}
+        )
+        self.assertEqual(self.server.connections, 0)
+        outbox_message = OutboxMessage.objects.get()
+        self.assertEqual(outbox_message.recipients, "user@test.ru")
+        self.assertIsNone(outbox_message.sent)
+
+    def test_batch_is_sent_over_one_connection(self):
+        """
+        Проверяем, что письма пакета уходят через одно соединение и
+        помечаются отправленными.
+        """
+        for i in range(3):
+            mail.send_mail(
+                f"Тема {i}", f"Текст письма {i}", "from@test.ru",
+                [f"user{i}@test.ru"],
+            )
+        self.send_queued_mail(batch_size=10)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 3)
+        self.assertIn("Текст письма 0".encode(), self.server.messages[0])
+        self.assertFalse(OutboxMessage.objects.filter(sent=None).exists())
+
+    def test_failed_message_is_retried(self):
+        """
+        Проверяем, что при ошибке письмо остается в очереди с числом
+        попыток и текстом ошибки.
+        """
+        mail.send_mail("Тема", "Текст", "from@test.ru", ["user@test.ru"])
+        with self.settings(
+            OUTBOX_EMAIL_BACKEND="core.tests.test_mail.FailingEmailBackend"
+        ):
+            call_command("send_queued_mail", stdout=StringIO())
+        outbox_message = OutboxMessage.objects.get()
+        self.assertIsNone(outbox_message.sent)
+        self.assertEqual(outbox_message.attempts, 1)
+        self.assertEqual(outbox_message.last_error, "SMTP is down")
+
+    def test_loop_survives_connection_errors(self):
+        """
+        Проверяем, что постоянный обработчик очереди не завершается, если
+        соединение с почтовым сервером не открывается.
+        """
+        mail.send_mail("Тема", "Текст", "from@test.ru", ["user@test.ru"])
+        UnreachableEmailBackend.open_calls = 0
+        with self.settings(
+            OUTBOX_EMAIL_BACKEND="core.tests.test_mail.UnreachableEmailBackend"
+        ), mock.patch(
+            "core.management.commands.send_queued_mail.time.sleep",
+            side_effect=[None, StopLoop],
+        ), self.assertLogs(
+            "core.management.commands.send_queued_mail", "ERROR"
+        ):
+            with self.assertRaises(StopLoop):
+                call_command(
+                    "send_queued_mail", loop=True, interval=0,
+                    stdout=StringIO(),
+                )
+        self.assertEqual(UnreachableEmailBackend.open_calls, 2)
+        self.assertIsNone(OutboxMessage.objects.get().sent)
@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+FILE_CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, "posts"))
+        with open(os.path.join(TEMP_MEDIA_ROOT, "posts", "small.gif"),
+                  "wb") as media_file:
+            media_file.write(FILE_CONTENT)
+        cls.url = settings.MEDIA_URL + "posts/small.gif"
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_file(self):
+        """Проверяем, что файл отдается целиком с ETag и типом."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response["Content-Type"], "image/gif")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertTrue(response.has_header("ETag"))
+        self.assertEqual(b"".join(response.streaming_content), FILE_CONTENT)
+
+    def test_range_request(self):
+        """Проверяем ответ на запрос диапазона байтов."""
+        cases = {
+            "bytes=10-19": (10, 19),
+            "bytes=1000-": (1000, 1023),
+            "bytes=-4": (1020, 1023),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.PARTIAL_CONTENT
+                )
+                self.assertEqual(
+                    response["Content-Range"], f"bytes {start}-{end}/1024"
+                )
+                self.assertEqual(
+                    b"".join(response.streaming_content),
+                    FILE_CONTENT[start:end + 1]
+                )
+
+    def test_unsatisfiable_range(self):
+        """Проверяем ответ 416 на недопустимый диапазон."""
+        response = self.client.get(self.url, HTTP_RANGE="bytes=2000-")
+        self.assertEqual(
+            response.status_code, HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_multiple_ranges_are_ignored(self):
+        """Проверяем, что запрос нескольких диапазонов получает весь файл."""
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-1,5-6")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(response.has_header("Content-Range"))
+        self.assertEqual(b"".join(response.streaming_content), FILE_CONTENT)
+
+    def test_if_none_match(self):
+        """Проверяем ответ 304 при совпадении ETag."""
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_proxy_delivery(self):
+        """Проверяем передачу файла фронт-прокси."""
+        with self.settings(MEDIA_DELIVERY="x-accel-redirect"):
+            response = self.client.get(self.url)
+            self.assertEqual(
+                response["X-Accel-Redirect"],
+                settings.MEDIA_ACCEL_REDIRECT_LOCATION + "posts/small.gif"
+            )
+            self.assertEqual(response.content, b"")
+        with self.settings(MEDIA_DELIVERY="x-sendfile"):
+            response = self.client.get(self.url)
+            self.assertEqual(
+                response["X-Sendfile"],
+                os.path.join(TEMP_MEDIA_ROOT, "posts", "small.gif")
+            )
+
+    def test_missing_and_outside_files(self):
+        """Проверяем 404 для отсутствующих файлов и выхода из MEDIA_ROOT."""
+        for path in ("posts/missing.gif", "../settings.py"):
+            with self.subTest(path=path):
+                response = self.client.get(settings.MEDIA_URL + path)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,36 @@
+from django.test import SimpleTestCase
+
+from yatube import production_settings
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    def test_debug_apps_are_removed(self):
+        """Проверяем, что отладочные приложения и middleware отключены."""
+        self.assertFalse(production_settings.DEBUG)
+        self.assertNotIn("debug_toolbar", production_settings.INSTALLED_APPS)
+        for middleware in production_settings.MIDDLEWARE:
+            with self.subTest(middleware=middleware):
+                self.assertFalse(middleware.startswith("debug_toolbar."))
+
+    def test_templates_and_connections_are_cached(self):
+        """
+        Проверяем, что шаблоны загружаются через кеширующий загрузчик,
+        а соединения с БД переиспользуются.
+        """
+        options = production_settings.TEMPLATES[0]["OPTIONS"]
+        self.assertEqual(
+            options["loaders"][0][0], "django.template.loaders.cached.Loader"
+        )
+        self.assertGreater(
+            production_settings.DATABASES["default"]["CONN_MAX_AGE"], 0
+        )
+
+    def test_cache_is_shared_between_workers(self):
+        """
+        Проверяем, что в продакшене кеш общий для всех процессов, а не
+        LocMemCache отдельного процесса.
+        """
+        self.assertNotEqual(
+            production_settings.CACHES["default"]["BACKEND"],
+            "django.core.cache.backends.locmem.LocMemCache",
+        )
@@ -0,0 +1,162 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from ..checks import check_rate_limits
+from ..ratelimit import TokenBucket, consume
+
+User = get_user_model()
+
+TEST_RATE_LIMITS = {
+    "add_comment": {
+        "user": {"capacity": 2, "refill_per_second": 0.5},
+        "ip": {"capacity": 100, "refill_per_second": 1},
+    },
+}
+
+
+@override_settings(RATE_LIMITS=TEST_RATE_LIMITS)
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.post = Post.objects.create(text="Тестовый пост", author=cls.user)
+        cls.url = reverse("posts:add_comment", args=(cls.post.pk,))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(RateLimitTest.user)
+
+    def _comment(self):
+        return self.client.post(RateLimitTest.url, data={"text": "Текст"})
+
+    @mock.patch("core.ratelimit.time.time", return_value=1000.0)
+    def test_burst_over_capacity_is_rejected(self, _):
+        """
+        Проверяем, что запросы сверх емкости корзины получают ответ 429
+        с заголовком Retry-After и не создают комментарии.
+        """
+        for _ in range(2):
+            self.assertEqual(self._comment().status_code, HTTPStatus.FOUND)
+        response = self._comment()
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "2")
+        self.assertTemplateUsed(response, "core/429.html")
+        self.assertEqual(RateLimitTest.post.comments.count(), 2)
+
+    def test_bucket_refills_over_time(self):
+        """Проверяем, что маркеры восстанавливаются со временем."""
+        with mock.patch("core.ratelimit.time.time", return_value=1000.0):
+            for _ in range(2):
+                self._comment()
+            self.assertEqual(
+                self._comment().status_code, HTTPStatus.TOO_MANY_REQUESTS
+            )
+        with mock.patch("core.ratelimit.time.time", return_value=1002.0):
+            self.assertEqual(self._comment().status_code, HTTPStatus.FOUND)
+
+    @mock.patch("core.ratelimit.time.time", return_value=1000.0)
+    def test_reads_are_not_limited(self, _):
+        """Проверяем, что безопасные методы не расходуют маркеры."""
+        for _ in range(5):
+            self.client.get(RateLimitTest.url)
+        self.assertEqual(self._comment().status_code, HTTPStatus.FOUND)
+
+    @mock.patch("core.ratelimit.time.time", return_value=1000.0)
+    def test_rejected_request_keeps_other_buckets(self, _):
+        """
+        Проверяем, что запрос, отклоненный корзиной пользователя, не
+        расходует маркеры корзины IP-адреса.
+        """
+        limits = {
+            "add_comment": {
+                "user": {"capacity": 2, "refill_per_second": 0.5},
+                "ip": {"capacity": 3, "refill_per_second": 0.01},
+            },
+        }
+        with self.settings(RATE_LIMITS=limits):
+            for _ in range(5):
+                self._comment()
+            other_client = Client()
+            other_client.force_login(
+                User.objects.create_user(username="other_user")
+            )
+            response = other_client.post(
+                RateLimitTest.url, data={"text": "Текст"}
+            )
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+            response = other_client.post(
+                RateLimitTest.url, data={"text": "Текст"}
+            )
+            self.assertEqual(
+                response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+            )
+
+    def test_concurrent_requests_share_tokens(self):
+        """
+        Проверяем, что параллельные запросы не получают больше маркеров,
+        чем есть в корзине.
+        """
+        bucket = TokenBucket("ratelimit:test", 5, 0.001)
+        barrier = threading.Barrier(10)
+
+        def take(_):
+            barrier.wait()
+            return consume([bucket])
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            results = list(executor.map(take, range(10)))
+        self.assertEqual(results.count(0), 5)
+
+    @mock.patch("core.ratelimit.time.time", return_value=1000.0)
+    def test_client_ip_is_read_from_proxy_header(self, _):
+        """
+        Проверяем, что за прокси корзины IP-адресов разделяются по адресу
+        клиента из заголовка прокси, а не по адресу самого прокси.
+        """
+        limits = {
+            "add_comment": {
+                "user": None,
+                "ip": {"capacity": 1, "refill_per_second": 0.01},
+            },
+        }
+        with self.settings(
+            RATE_LIMITS=limits,
+            RATE_LIMIT_CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR",
+        ):
+            for address in ("10.0.0.1", "10.0.0.2"):
+                with self.subTest(address=address):
+                    response = self.client.post(
+                        RateLimitTest.url, data={"text": "Текст"},
+                        HTTP_X_FORWARDED_FOR=f"1.2.3.4, {address}",
+                    )
+                    self.assertEqual(response.status_code, HTTPStatus.FOUND)
+            response = self.client.post(
+                RateLimitTest.url, data={"text": "Текст"},
+                HTTP_X_FORWARDED_FOR="10.0.0.1",
+            )
+            self.assertEqual(
+                response.status_code, HTTPStatus.TOO_MANY_REQUESTS
+            )
+
+    def test_non_positive_refill_is_rejected(self):
+        """Проверяем, что нулевая скорость пополнения - ошибка настроек."""
+        limits = {
+            "add_comment": {
+                "user": {"capacity": 2, "refill_per_second": 0},
+            },
+        }
+        with self.settings(RATE_LIMITS=limits):
+            errors = check_rate_limits(None)
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+        self.assertEqual(check_rate_limits(None), [])
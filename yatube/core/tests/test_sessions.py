@@ -0,0 +1,83 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+DB_SESSION_MIDDLEWARE = [
+    "django.contrib.auth.middleware.AuthenticationMiddleware"
+    if middleware == "core.middleware.CachedAuthenticationMiddleware"
+    else middleware
+    for middleware in settings.MIDDLEWARE
+]
+
+
+class CachedSessionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="follower")
+        cls.author = User.objects.create_user(username="author")
+        Follow.objects.create(user=cls.user, author=cls.author)
+        Post.objects.create(text="Пост автора", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+
+    def _count_follow_index_queries(self):
+        # Middleware загружаются при первом запросе клиента, поэтому для
+        # каждого набора настроек нужен новый клиент.
+        client = Client()
+        client.force_login(self.user)
+        url = reverse("posts:follow_index")
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        self.assertContains(response, "Пост автора")
+        return len(queries)
+
+    def test_follow_index_issues_fewer_queries(self):
+        """
+        Проверяем, что с сессиями в кеше и кешированным пользователем
+        повторный запрос ленты подписок не читает сессию и пользователя
+        из БД.
+        """
+        with self.settings(
+            SESSION_ENGINE="django.contrib.sessions.backends.db",
+            MIDDLEWARE=DB_SESSION_MIDDLEWARE,
+        ):
+            db_queries = self._count_follow_index_queries()
+        cached_queries = self._count_follow_index_queries()
+        self.assertEqual(cached_queries, db_queries - 2)
+
+    def test_password_change_ends_cached_session(self):
+        """
+        Проверяем, что смена пароля завершает сессию, несмотря на кеш.
+        """
+        user = User.objects.create_user(username="auth_user")
+        self.client.force_login(user)
+        url = reverse("posts:follow_index")
+        self.client.get(url)
+        user.set_password("new-password")
+        user.save()
+        response = self.client.get(url)
+        self.assertRedirects(
+            response, f"{reverse('users:login')}?next={url}"
+        )
+
+    def test_user_changes_are_visible(self):
+        """Проверяем, что изменение пользователя сбрасывает кеш."""
+        user = User.objects.create_user(username="auth_user")
+        self.client.force_login(user)
+        url = reverse("posts:follow_index")
+        self.client.get(url)
+        user.first_name = "Новое имя"
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context["user"].first_name, "Новое имя")
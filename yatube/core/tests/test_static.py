@@ -0,0 +1,94 @@
+import gzip
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..compression import brotli
+from ..middleware import PrecompressedStaticMiddleware
+
+STATIC_SOURCE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CSS_CONTENT = b"body { margin: 0; padding: 0; }\n" * 50
+
+
+@override_settings(
+    STATICFILES_DIRS=(STATIC_SOURCE_DIR,),
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE="core.storage.CompressedManifestStaticFilesStorage",
+)
+class PrecompressedStaticTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(STATIC_SOURCE_DIR, "css"))
+        with open(os.path.join(STATIC_SOURCE_DIR, "css", "site.css"),
+                  "wb") as css:
+            css.write(CSS_CONTENT)
+        call_command("collectstatic", interactive=False, stdout=StringIO())
+        cls.hashed_name = staticfiles_storage.stored_name("css/site.css")
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(STATIC_SOURCE_DIR, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def test_collectstatic_writes_compressed_variants(self):
+        """
+        Проверяем, что collectstatic записывает сжатые версии файлов
+        с хешем в имени.
+        """
+        path = os.path.join(STATIC_ROOT, self.hashed_name)
+        with open(path + ".gz", "rb") as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), CSS_CONTENT)
+        if brotli is not None:
+            self.assertTrue(os.path.isfile(path + ".br"))
+
+    def test_middleware_serves_precompressed_file(self):
+        """
+        Проверяем, что middleware отдает сжатую версию файла с заголовками
+        долговременного кеширования.
+        """
+        url = settings.STATIC_URL + self.hashed_name
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Content-Type"], "text/css")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(
+            gzip.decompress(b"".join(response.streaming_content)),
+            CSS_CONTENT
+        )
+
+    def test_middleware_serves_plain_file_without_accept_encoding(self):
+        """Проверяем, что без Accept-Encoding отдается исходный файл."""
+        response = self.client.get(settings.STATIC_URL + "css/site.css")
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertEqual(b"".join(response.streaming_content), CSS_CONTENT)
+
+    def test_middleware_skips_forbidden_encoding(self):
+        """Проверяем, что алгоритм с q=0 не выбирается."""
+        response = self.client.get(
+            settings.STATIC_URL + self.hashed_name,
+            HTTP_ACCEPT_ENCODING="gzip;q=0, br;q=0",
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), CSS_CONTENT)
+
+    def test_middleware_is_disabled_in_debug(self):
+        """Проверяем, что при DEBUG middleware отключается."""
+        with self.settings(DEBUG=True):
+            with self.assertRaises(MiddlewareNotUsed):
+                PrecompressedStaticMiddleware(lambda request: None)
@@ -0,0 +1,123 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import (SimpleUploadedFile,
+                                            TemporaryUploadedFile)
+from django.db import OperationalError
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import Post
+
+from ..models import StoredFile
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x01\x00"
+    b"\x01\x00\x00\x00\x00\x21\xf9\x04"
+    b"\x01\x0a\x00\x01\x00\x2c\x00\x00"
+    b"\x00\x00\x01\x00\x01\x00\x00\x02"
+    b"\x02\x4c\x01\x00\x3b"
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ContentAddressedStorageTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="auth_user")
+
+    def _create_post(self, filename):
+        return Post.objects.create(
+            text="Пост с картинкой",
+            author=self.user,
+            image=SimpleUploadedFile(
+                filename, SMALL_GIF, content_type="image/gif"
+            ),
+        )
+
+    def test_identical_uploads_are_stored_once(self):
+        """
+        Проверяем, что одинаковые файлы хранятся один раз в подкаталоге,
+        определяемом хешем содержимого.
+        """
+        first = self._create_post("first.gif")
+        second = self._create_post("second.GIF")
+        self.assertEqual(first.image.name, second.image.name)
+        directory, filename = os.path.split(first.image.name)
+        digest = filename.split(".")[0]
+        self.assertEqual(
+            directory, "/".join(("posts", digest[:2], digest[2:4]))
+        )
+        self.assertTrue(filename.endswith(".gif"))
+        self.assertEqual(
+            StoredFile.objects.get(name=first.image.name).refcount, 2
+        )
+
+    def test_file_is_removed_with_last_reference(self):
+        """
+        Проверяем, что файл удаляется только после удаления последнего
+        поста, который на него ссылается.
+        """
+        first = self._create_post("first.gif")
+        second = self._create_post("second.gif")
+        path = first.image.path
+        first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(
+            StoredFile.objects.get(name=second.image.name).refcount, 1
+        )
+        second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_identical_temporary_uploads_are_stored_once(self):
+        """
+        Проверяем, что повторная загрузка тех же байтов через временный
+        файл не зацикливается и только увеличивает число ссылок.
+        """
+        names = []
+        for filename in ("first.gif", "second.gif"):
+            upload = TemporaryUploadedFile(
+                filename, "image/gif", len(SMALL_GIF), None
+            )
+            upload.write(SMALL_GIF)
+            upload.seek(0)
+            post = Post.objects.create(
+                text="Пост с картинкой", author=self.user, image=upload
+            )
+            upload.close()
+            names.append(post.image.name)
+        self.assertEqual(names[0], names[1])
+        self.assertEqual(StoredFile.objects.get(name=names[0]).refcount, 2)
+        with open(os.path.join(TEMP_MEDIA_ROOT, names[0]), "rb") as file:
+            self.assertEqual(file.read(), SMALL_GIF)
+
+    def test_failed_save_keeps_replaced_image(self):
+        """
+        Проверяем, что при неудачном сохранении поста с новой картинкой
+        старая картинка не освобождается.
+        """
+        post = self._create_post("first.gif")
+        path = post.image.path
+        post.image = SimpleUploadedFile(
+            "other.gif", SMALL_GIF + b"\x00", content_type="image/gif"
+        )
+        with mock.patch.object(
+            Post, "_save_table",
+            side_effect=OperationalError("database is locked"),
+        ):
+            with self.assertRaises(OperationalError):
+                post.save()
+        self.assertTrue(os.path.exists(path))
+        name = Post.objects.get().image.name
+        self.assertEqual(StoredFile.objects.get(name=name).refcount, 1)
@@ -1,4 +1,18 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
 
 
 def page_not_found(request, exception):
@@ -17,3 +31,126 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def _parse_range(header, size):
+    """
+    Разбирает заголовок Range с одним диапазоном байтов. Возвращает пару
+    (начало, конец) включительно или None, если диапазон недопустим.
+    """
+    match = RANGE_RE.match(header)
+    if not match:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end or int(end) == 0:
+            return None
+        return max(size - int(end), 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def _file_range(file, start, length, chunk_size=FileResponse.block_size):
+    with file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+
+
+def _file_response(request, path, full_path, size, delivery):
+    if delivery == "x-accel-redirect":
+        response = HttpResponse()
+        response["X-Accel-Redirect"] = (
+            settings.MEDIA_ACCEL_REDIRECT_LOCATION + quote(path)
+        )
+        return response
+    if delivery == "x-sendfile":
+        response = HttpResponse()
+        response["X-Sendfile"] = full_path
+        return response
+
+    range_header = request.META.get("HTTP_RANGE")
+    # Несколько диапазонов (multipart/byteranges) не поддерживаются: такой
+    # заголовок игнорируется, и файл отдается целиком.
+    if range_header and size and "," not in range_header:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _file_range(open(full_path, "rb"), start, length), status=206
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return response
+    # Без диапазона отдаем файл целиком: WSGI-сервер может передать его
+    # через wsgi.file_wrapper (os.sendfile), минуя буферы Python.
+    return FileResponse(open(full_path, "rb"))
+
+
+def serve_file(request, root, path, max_age, delivery="python"):
+    """
+    Отдает файл path из каталога root с ETag, Last-Modified и, при
+    доставке самим приложением, поддержкой Range.
+    """
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        if request.META.get("HTTP_IF_RANGE", etag) != etag:
+            request.META.pop("HTTP_RANGE", None)
+        response = _file_response(
+            request, path, full_path, stat.st_size, delivery
+        )
+    content_type, encoding = mimetypes.guess_type(full_path)
+    if response.status_code != 304 and not encoding:
+        response["Content-Type"] = (
+            content_type or "application/octet-stream"
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    return response
+
+
+def serve_media(request, path):
+    """
+    Отдает файлы из MEDIA_ROOT. В зависимости от MEDIA_DELIVERY файл
+    передается фронт-прокси заголовком X-Accel-Redirect или X-Sendfile,
+    либо отдается самим приложением с поддержкой Range и ETag.
+    """
+    return serve_file(
+        request, settings.MEDIA_ROOT, path, settings.MEDIA_MAX_AGE,
+        settings.MEDIA_DELIVERY,
+    )
+
+
+def serve_sitemap(request, path):
+    """
+    Отдает файлы карты сайта, которые пишет команда generate_sitemaps.
+    В продакшене их может отдавать напрямую фронт-прокси из SITEMAP_ROOT.
+    """
+    return serve_file(
+        request, settings.SITEMAP_ROOT, path, settings.SITEMAP_MAX_AGE
+    )
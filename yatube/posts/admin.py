@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import Comment, Follow, Group, Notification, Post
+from .purge import soft_delete_group, soft_delete_post
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,6 +17,27 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("pub_date", )
     empty_value_display = "-пусто-"
 
+    def delete_model(self, request, obj):
+        soft_delete_post(obj)
+
+    def delete_queryset(self, request, queryset):
+        for post in queryset:
+            soft_delete_post(post)
+
+
+class GroupAdmin(admin.ModelAdmin):
+    """
+    Удаление из админки только скрывает группу: посты отвязывает пачками
+    команда purge_deleted.
+    """
+
+    def delete_model(self, request, obj):
+        soft_delete_group(obj)
+
+    def delete_queryset(self, request, queryset):
+        for group in queryset:
+            soft_delete_group(group)
+
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
@@ -39,7 +61,21 @@ class FollowAdmin(admin.ModelAdmin):
     empty_value_display = "-пусто-"
 
 
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        "pk",
+        "recipient",
+        "actor",
+        "kind",
+        "created",
+        "is_read",
+    )
+    list_filter = ("kind", "is_read")
+    empty_value_display = "-пусто-"
+
+
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(Notification, NotificationAdmin)
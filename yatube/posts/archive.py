@@ -0,0 +1,107 @@
+from collections import Counter
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, QuerySet
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import ArchivedPost, Post, PostArchiveMonth
+
+Scope = Tuple[str, int]
+
+
+def get_post_scopes(author_id: int, group_id: Optional[int]) -> List[Scope]:
+    scopes = [
+        (PostArchiveMonth.SITE, 0),
+        (PostArchiveMonth.AUTHOR, author_id),
+    ]
+    if group_id is not None:
+        scopes.append((PostArchiveMonth.GROUP, group_id))
+    return scopes
+
+
+def get_month(pub_date) -> Tuple[int, int]:
+    """Год и месяц публикации в текущем часовом поясе."""
+    pub_date = timezone.localtime(pub_date)
+    return pub_date.year, pub_date.month
+
+
+def get_month_range(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Границы месяца [начало, начало следующего) для запроса по индексу."""
+    start = timezone.make_aware(datetime(year, month, 1))
+    if month == 12:
+        end = timezone.make_aware(datetime(year + 1, 1, 1))
+    else:
+        end = timezone.make_aware(datetime(year, month + 1, 1))
+    return start, end
+
+
+def change_post_count(scopes: List[Scope], year: int, month: int,
+                      delta: int) -> None:
+    """Изменяет счетчики месяца для каждой области на delta."""
+    for scope, scope_id in scopes:
+        lookup = {
+            "scope": scope, "scope_id": scope_id,
+            "year": year, "month": month,
+        }
+        counters = PostArchiveMonth.objects.filter(**lookup)
+        if counters.update(post_count=F("post_count") + delta):
+            continue
+        with transaction.atomic():
+            _, created = PostArchiveMonth.objects.get_or_create(
+                **lookup, defaults={"post_count": delta}
+            )
+        if not created:
+            counters.update(post_count=F("post_count") + delta)
+
+
+def archive_months(scope: str, scope_id: int = 0) -> QuerySet:
+    """Месяцы с постами для области от новых к старым."""
+    return PostArchiveMonth.objects.filter(
+        scope=scope, scope_id=scope_id, post_count__gt=0
+    )
+
+
+def rebuild_post_archive() -> int:
+    """
+    Пересчитывает таблицу PostArchiveMonth по всем постам: счетчики
+    месяца складываются из постов в Post и в архивной таблице. Как и
+    сигналы, считаются все посты без отметки об удалении, в том числе
+    посты удаленных пользователей до очистки: их вычитает purge_deleted.
+    """
+    counts = Counter()
+    groupings = (
+        (PostArchiveMonth.SITE, None),
+        (PostArchiveMonth.AUTHOR, "author_id"),
+        (PostArchiveMonth.GROUP, "group_id"),
+    )
+    for posts in (
+        Post.all_objects.filter(deleted_at=None),
+        ArchivedPost.all_objects.all(),
+    ):
+        posts = posts.order_by().annotate(
+            year=ExtractYear("pub_date"), month=ExtractMonth("pub_date")
+        )
+        for scope, field in groupings:
+            rows = posts.filter(**{f"{field}__isnull": False} if field else {})
+            fields = ("year", "month") + ((field,) if field else ())
+            for row in rows.values(*fields).annotate(post_count=Count("pk")):
+                scope_id = row[field] if field else 0
+                key = (scope, scope_id, row["year"], row["month"])
+                counts[key] += row["post_count"]
+    counters = [
+        PostArchiveMonth(
+            scope=scope,
+            scope_id=scope_id,
+            year=year,
+            month=month,
+            post_count=post_count,
+        )
+        for (scope, scope_id, year, month), post_count in counts.items()
+    ]
+    with transaction.atomic():
+        PostArchiveMonth.objects.all().delete()
+        PostArchiveMonth.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
@@ -0,0 +1,86 @@
+import time
+from datetime import datetime
+from typing import Tuple
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import (ArchivedComment, ArchivedPost, Comment, Notification,
+                     Post, TrendingPost)
+from .notifications import reset_unread_counts
+from .queries import invalidate_cached_posts, invalidate_group_directory
+
+
+def archive_post_batch(pks) -> int:
+    """
+    Переносит посты с id из pks и их комментарии в архивные таблицы.
+    Возвращает число перенесенных комментариев.
+    """
+    posts = Post.all_objects.filter(pk__in=pks)
+    comments = Comment.objects.filter(post_id__in=pks)
+    ArchivedPost.all_objects.bulk_create(
+        ArchivedPost(
+            id=post.pk,
+            text=post.text,
+            excerpt=post.excerpt,
+            excerpt_truncated=post.excerpt_truncated,
+            pub_date=post.pub_date,
+            author_id=post.author_id,
+            group_id=post.group_id,
+            image=post.image.name,
+        )
+        for post in posts
+    )
+    archived_comments = ArchivedComment.objects.bulk_create(
+        ArchivedComment(
+            id=comment.pk,
+            post_id=comment.post_id,
+            author_id=comment.author_id,
+            text=comment.text,
+            created=comment.created,
+        )
+        for comment in comments
+    )
+    post_notifications = Notification.objects.filter(
+        Q(post_id__in=pks) | Q(comment__post_id__in=pks)
+    )
+    recipients = list(
+        post_notifications.filter(is_read=False)
+        .values_list("recipient_id", flat=True)
+        .distinct()
+    )
+    post_notifications.delete()
+    reset_unread_counts(recipients)
+    TrendingPost.objects.filter(post_id__in=pks).delete()
+    comments.delete()
+    # Без сигналов post_delete: картинка переходит к архивной копии, а
+    # пост остается в счетчиках архива по месяцам.
+    posts._raw_delete(posts.db)
+    invalidate_cached_posts(pks)
+    return len(archived_comments)
+
+
+def archive_old_posts(before: datetime, batch_size: int,
+                      pause: float = 0) -> Tuple[int, int]:
+    """
+    Переносит посты старше before и их комментарии из Post и Comment в
+    ArchivedPost и ArchivedComment пачками по batch_size, каждую в своей
+    транзакции. Скрытые посты оставляет команде purge_deleted.
+    Возвращает число перенесенных постов и комментариев.
+    """
+    old_posts = Post.all_objects.filter(pub_date__lt=before, deleted_at=None)
+    archived_posts = archived_comments = 0
+    while True:
+        with transaction.atomic():
+            pks = list(
+                old_posts.order_by("pub_date", "pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            archived_comments += archive_post_batch(pks)
+        archived_posts += len(pks)
+        time.sleep(pause)
+    if archived_posts:
+        invalidate_group_directory()
+    return archived_posts, archived_comments
@@ -0,0 +1,178 @@
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from . import queries
+from .identity import get_identity_map
+from .models import Group
+
+User = get_user_model()
+
+FEED_VERSION_KEY = "feed_version:{}"
+# Ссылки в ленте абсолютные, поэтому тело хранится отдельно для каждой
+# схемы и каждого хоста.
+FEED_BODY_KEY = "feed_body:{}:{}:{}:{}:{}"
+
+
+def get_feed_version(scope: str) -> int:
+    """
+    Версия ленты - время последнего изменения ее постов в микросекундах.
+    После сброса кеша версия начинается заново с текущего времени.
+    """
+    key = FEED_VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns() // 1000
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def set_feed_versions(scopes: Iterable[str]) -> None:
+    """Меняет версии лент scopes на текущее время."""
+    version = time.time_ns() // 1000
+    cache.set_many(
+        {FEED_VERSION_KEY.format(scope): version for scope in scopes}, None
+    )
+
+
+def bump_feed_versions(author_id: int,
+                       group_ids: Iterable[Optional[int]]) -> None:
+    """Меняет версии лент, в которые входит пост."""
+    set_feed_versions(["site", f"author:{author_id}"] + [
+        f"group:{group_id}" for group_id in group_ids if group_id is not None
+    ])
+
+
+class IndexFeed(Feed):
+    """
+    Лента главной страницы и основа лент групп и авторов. Тело ленты
+    хранится в кеше под ключом с версией ленты. ETag и Last-Modified
+    строятся из версии, поэтому повторный запрос клиента с If-None-Match
+    или If-Modified-Since получает ответ 304 без запросов за постами.
+    """
+
+    def get_scope(self, obj) -> str:
+        return "site"
+
+    def title(self, obj):
+        return "Yatube: последние обновления на сайте"
+
+    def link(self, obj):
+        return reverse("posts:index")
+
+    def description(self, obj):
+        return "Новые записи всех авторов"
+
+    def items(self, obj):
+        return queries.index_feed()[:settings.FEED_SIZE]
+
+    def item_title(self, item):
+        return f"{self.item_author_name(item)}: {item.excerpt[:50]}"
+
+    def item_description(self, item):
+        return item.excerpt + ("…" if item.excerpt_truncated else "")
+
+    def item_link(self, item):
+        return reverse("posts:post_detail", args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def __call__(self, request, *args, **kwargs):
+        scope = self.get_scope(self.get_object(request, *args, **kwargs))
+        version = get_feed_version(scope)
+        etag = quote_etag(f"{self.feed_type.__name__}-{scope}-{version}")
+        last_modified = version // 10 ** 6
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = FEED_BODY_KEY.format(
+                "https" if request.is_secure() else "http",
+                request.get_host(),
+                self.feed_type.__name__,
+                scope,
+                version,
+            )
+            cached = cache.get(key)
+            if cached is None:
+                response = super().__call__(request, *args, **kwargs)
+                cache.set(
+                    key, (response.content, response["Content-Type"]),
+                    settings.FEED_CACHE_TIMEOUT,
+                )
+            else:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class GroupFeed(IndexFeed):
+    def get_object(self, request, slug):
+        return get_identity_map(request).get_or_404(Group, slug=slug)
+
+    def get_scope(self, group):
+        return f"group:{group.pk}"
+
+    def title(self, group):
+        return f"Yatube: записи сообщества {group.title}"
+
+    def link(self, group):
+        return reverse("posts:group_list", args=(group.slug,))
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return queries.group_feed(group)[:settings.FEED_SIZE]
+
+
+class AuthorFeed(IndexFeed):
+    def get_object(self, request, username):
+        return get_identity_map(request).get_or_404(User, username=username)
+
+    def get_scope(self, author):
+        return f"author:{author.pk}"
+
+    def title(self, author):
+        name = author.get_full_name() or author.username
+        return f"Yatube: записи пользователя {name}"
+
+    def link(self, author):
+        return reverse("posts:profile", args=(author.username,))
+
+    def description(self, author):
+        return f"Новые записи пользователя {author.username}"
+
+    def items(self, author):
+        return queries.profile_feed(author)[:settings.FEED_SIZE]
+
+
+class IndexAtomFeed(IndexFeed):
+    feed_type = Atom1Feed
+    subtitle = IndexFeed.description
+
+
+class GroupAtomFeed(GroupFeed):
+    feed_type = Atom1Feed
+    subtitle = GroupFeed.description
+
+
+class AuthorAtomFeed(AuthorFeed):
+    feed_type = Atom1Feed
+    subtitle = AuthorFeed.description
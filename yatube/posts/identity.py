@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.http import Http404, HttpRequest
+
+from . import queries
+from .models import Group, Post
+
+User = get_user_model()
+
+# Поля, по которым объект однозначно находится в карте идентичности.
+NATURAL_KEYS = {
+    User: ("pk", "username"),
+    Group: ("pk", "slug"),
+    Post: ("pk",),
+}
+
+
+class IdentityMap:
+    """
+    Карта идентичности объектов User, Post и Group в пределах одного запроса:
+    каждая строка загружается из БД не более одного раза.
+    """
+
+    def __init__(self, user=None):
+        self._objects = {}
+        if user is not None and user.is_authenticated:
+            self.add(user)
+
+    @staticmethod
+    def _key(model, field, value):
+        if field == "id":
+            field = "pk"
+        if field == "pk":
+            value = int(value)
+        return model, field, value
+
+    def add(self, instance):
+        model = instance._meta.concrete_model
+        for field in NATURAL_KEYS.get(model, ()):
+            key = self._key(model, field, getattr(instance, field))
+            self._objects.setdefault(key, instance)
+        if model is Post:
+            self._attach_post_relations(instance)
+        return instance
+
+    def _attach_post_relations(self, post):
+        for name, model, pk in (
+            ("author", User, post.author_id),
+            ("group", Group, post.group_id),
+        ):
+            if pk is None:
+                continue
+            related = self._objects.get(self._key(model, "pk", pk))
+            if related is not None:
+                setattr(post, name, related)
+            elif post._meta.get_field(name).is_cached(post):
+                self.add(getattr(post, name))
+
+    def get(self, model, **lookup):
+        (field, value), = lookup.items()
+        try:
+            key = self._key(model, field, value)
+        except (TypeError, ValueError):
+            raise model.DoesNotExist
+        instance = self._objects.get(key)
+        if instance is None:
+            if model is Post:
+                # Посты по pk читаются через кеш, см. queries.get_cached_post.
+                instance = self.add(queries.get_cached_post(key[2]))
+            else:
+                instance = self.add(self._queryset(model).get(**lookup))
+        return instance
+
+    @staticmethod
+    def _queryset(model):
+        queryset = model._default_manager.all()
+        if model is Post:
+            queryset = queryset.select_related("author", "group")
+        elif model is User:
+            # Удаленные пользователи неактивны до очистки.
+            queryset = queryset.filter(is_active=True)
+        return queryset
+
+    def get_or_404(self, model, **lookup):
+        try:
+            return self.get(model, **lookup)
+        except model.DoesNotExist:
+            raise Http404(
+                f"No {model._meta.object_name} matches the given query."
+            )
+
+
+def get_identity_map(request: HttpRequest) -> IdentityMap:
+    identity_map = getattr(request, "_identity_map", None)
+    if identity_map is None:
+        identity_map = IdentityMap(getattr(request, "user", None))
+        request._identity_map = identity_map
+    return identity_map
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.cold_storage import archive_old_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит посты старше --days дней и их комментарии в архивные "
+        "таблицы, чтобы таблица Post и ее индексы оставались небольшими. "
+        "Страницы постов, профилей и архива читают обе таблицы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=settings.POST_COLD_AFTER_DAYS
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.PURGE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--pause", type=float, default=settings.PURGE_PAUSE,
+            help="Пауза в секундах между пачками.",
+        )
+
+    def handle(self, *args, days, batch_size, pause, **options):
+        posts, comments = archive_old_posts(
+            timezone.now() - timedelta(days=days), batch_size, pause
+        )
+        self.stdout.write(
+            f"Перенесено постов: {posts}, комментариев: {comments}"
+        )
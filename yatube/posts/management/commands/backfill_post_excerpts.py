@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохраненные анонсы постов пакетами."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Post.all_objects
+                    .filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .only("text", "excerpt", "excerpt_truncated")
+                [:batch_size]
+            )
+            if not batch:
+                break
+            for post in batch:
+                post.update_excerpt()
+            with transaction.atomic():
+                Post.all_objects.bulk_update(
+                    batch, ("excerpt", "excerpt_truncated")
+                )
+            updated += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f"Обновлено анонсов: {updated}")
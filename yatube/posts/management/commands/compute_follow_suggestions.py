@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.suggestions import rebuild_follow_suggestions, sparse
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает рекомендации подписок по графу подписок. Требует "
+        "numpy и scipy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count", type=int, default=settings.FOLLOW_SUGGESTIONS_COUNT,
+            help="Сколько рекомендаций хранить для каждого пользователя."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Сколько пользователей обрабатывать за один шаг."
+        )
+
+    def handle(self, *args, count, chunk_size, **options):
+        if sparse is None:
+            raise CommandError("Install numpy and scipy to run this command")
+        saved = rebuild_follow_suggestions(count, chunk_size)
+        self.stdout.write(f"Сохранено рекомендаций: {saved}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import rebuild_trending
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает рейтинг популярных постов по комментариям. "
+        "Запускается периодически, например из cron раз в 5 минут."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_trending()
+        self.stdout.write(f"Постов в рейтинге: {count}")
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import generate_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Обновляет статические файлы карты сайта в SITEMAP_ROOT. "
+        "Переписываются только шарды, в которых изменились строки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url", default=settings.SITEMAP_BASE_URL,
+            help="Адрес сайта для ссылок в карте.",
+        )
+        parser.add_argument(
+            "--shard-size", type=int, default=settings.SITEMAP_SHARD_SIZE,
+            help="Наибольшее число адресов в одном файле.",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Переписать все шарды.",
+        )
+
+    def handle(self, *args, **options):
+        written, skipped = generate_sitemaps(
+            base_url=options["base_url"],
+            shard_size=options["shard_size"],
+            force=options["force"],
+        )
+        self.stdout.write(
+            f"Записано шардов: {written}, без изменений: {skipped}"
+        )
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет скрытые посты и группы и пользователей из очереди "
+        "удаления. Зависимые строки удаляются пачками по --batch-size "
+        "в отдельных транзакциях. С --loop работает как постоянный "
+        "обработчик."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.PURGE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--pause", type=float, default=settings.PURGE_PAUSE,
+            help="Пауза в секундах между пачками.",
+        )
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument(
+            "--interval", type=float, default=60.0,
+            help="Пауза в секундах между проходами с --loop.",
+        )
+
+    def handle(self, *args, batch_size, pause, loop, interval, **options):
+        while True:
+            purged = purge_deleted(batch_size, pause)
+            if any(purged.values()):
+                self.stdout.write(", ".join(
+                    f"{name}: {count}" for name, count in purged.items()
+                    if count
+                ))
+            if not loop:
+                break
+            time.sleep(interval)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import rebuild_post_archive
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает помесячные счетчики постов архива. Нужен после "
+        "миграции и массовой загрузки постов в обход сигналов."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_post_archive()
+        self.stdout.write(f"Записано месяцев: {count}")
@@ -0,0 +1,177 @@
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import queries
+from posts.models import Group
+from posts.thumbnails import get_responsive_thumbnails
+
+User = get_user_model()
+
+# Кеш страниц хранит отдельный вариант страницы для каждого значения
+# Accept-Encoding: прогреваем значения, которые присылают браузеры, и
+# запрос без сжатия.
+ACCEPT_ENCODINGS = ("gzip, deflate, br", "gzip, deflate", "")
+
+
+class Command(BaseCommand):
+    help = (
+        "Прогревает кеши перед вводом узла в работу: запрашивает первые "
+        "страницы главной, которые хранятся в кеше страниц, и создает "
+        "уменьшенные копии картинок их постов и постов в лентах самых "
+        "активных групп и популярных авторов. Кеш LocMemCache у "
+        "каждого процесса свой, поэтому страницы запущенного узла "
+        "прогреваются запросами по HTTP через --base-url; без него страницы "
+        "отрисовываются в этом процессе, что имеет смысл только для общего "
+        "бэкенда кеша."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=5)
+        parser.add_argument("--groups", type=int, default=10)
+        parser.add_argument("--profiles", type=int, default=10)
+        parser.add_argument(
+            "--days", type=int, default=7,
+            help="За сколько дней считать активность групп."
+        )
+        parser.add_argument("--workers", type=int, default=4)
+        parser.add_argument(
+            "--budget", type=float, default=60.0,
+            help="Время на прогрев в секундах."
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Адрес узла, например http://127.0.0.1:8000."
+        )
+        parser.add_argument(
+            "--host", default=(settings.ALLOWED_HOSTS or ["localhost"])[0],
+            help="Заголовок Host для запросов без --base-url."
+        )
+        parser.add_argument("--skip-thumbnails", action="store_true")
+
+    def handle(self, *args, **options):
+        self.deadline = time.monotonic() + options["budget"]
+        self.base_url = options["base_url"]
+        self.host = options["host"]
+        groups = self._hottest_groups(options["groups"], options["days"])
+        authors = self._popular_authors(options["profiles"])
+
+        tasks = []
+        posts = {}
+        per_page = settings.NUMBER_OF_POSTS_PER_PAGE
+        index_url = reverse("posts:index")
+        # Главная без параметров и ссылки пагинатора - разные ключи кеша
+        # страниц, поэтому первая страница прогревается по обоим адресам.
+        index_urls = [index_url] + [
+            f"{index_url}?page={page}"
+            for page in range(1, options["pages"] + 1)
+        ]
+        for url in index_urls:
+            for encoding in ACCEPT_ENCODINGS:
+                tasks.append((self._fetch, url, encoding))
+        posts.update(
+            (post.pk, post) for post in
+            queries.index_feed()[:options["pages"] * per_page]
+        )
+        # Ленты групп и авторов не хранятся в кеше страниц, поэтому их
+        # страницы не запрашиваются - прогреваются только картинки.
+        for group in groups:
+            posts.update(
+                (post.pk, post)
+                for post in queries.group_feed(group)[:per_page]
+            )
+        for author in authors:
+            posts.update(
+                (post.pk, post)
+                for post in queries.profile_feed(author)[:per_page]
+            )
+        if not options["skip_thumbnails"]:
+            # Копии создаются раньше страниц, чтобы страницы их не ждали.
+            tasks[:0] = [
+                (self._make_thumbnails, post)
+                for post in posts.values() if post.image
+            ]
+
+        done, failed, skipped = self._run(tasks, options["workers"])
+        self.stdout.write(
+            f"Выполнено: {done}, с ошибками: {failed}, "
+            f"не успели: {skipped}"
+        )
+
+    def _hottest_groups(self, limit, days):
+        since = timezone.now() - timedelta(days=days)
+        recent = Count("posts", filter=Q(posts__pub_date__gte=since))
+        groups = Group.objects.annotate(recent=recent, total=Count("posts"))
+        return list(
+            groups.filter(total__gt=0)
+                  .order_by("-recent", "-total")
+                  .only("slug")[:limit]
+        )
+
+    def _popular_authors(self, limit):
+        # Подписчиков считаем без повторов из-за соединения с постами.
+        followers = Count("following", distinct=True)
+        authors = User.objects.filter(posts__isnull=False).annotate(
+            followers=followers
+        )
+        return list(authors.order_by("-followers").only("username")[:limit])
+
+    def _run(self, tasks, workers):
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = [
+                executor.submit(self._call, task, *args)
+                for task, *args in tasks
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is True:
+                    done += 1
+                elif result is False:
+                    failed += 1
+        return done, failed, len(tasks) - done - failed
+
+    def _call(self, task, *args):
+        """
+        Выполняет задачу, если бюджет времени не исчерпан. Возвращает None
+        для пропущенной задачи.
+        """
+        if time.monotonic() >= self.deadline:
+            return None
+        try:
+            task(*args)
+        except Exception as error:
+            self.stderr.write(f"{task.__name__}{args}: {error}")
+            return False
+        finally:
+            # Каждый поток открывает свое соединение с БД.
+            connections.close_all()
+        return True
+
+    def _fetch(self, path, encoding):
+        if self.base_url:
+            request = urllib.request.Request(
+                self.base_url.rstrip("/") + path,
+                headers={"Accept-Encoding": encoding} if encoding else {},
+            )
+            timeout = max(self.deadline - time.monotonic(), 1)
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+            return
+        headers = {"HTTP_ACCEPT_ENCODING": encoding} if encoding else {}
+        response = Client(HTTP_HOST=self.host).get(path, **headers)
+        if response.status_code != 200:
+            raise CommandError(f"{path}: {response.status_code}")
+
+    def _make_thumbnails(self, post):
+        get_responsive_thumbnails(post.image)
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_auto_20261019_1000'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('rank', models.PositiveIntegerField(unique=True, verbose_name='Место в рейтинге')),
+                ('score', models.FloatField(verbose_name='Оценка популярности')),
+                ('computed', models.DateTimeField(verbose_name='Дата расчета')),
+            ],
+            options={
+                'verbose_name': 'Trending post',
+                'verbose_name_plural': 'Trending posts',
+                'ordering': ('rank',),
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_auto_20261019_1013'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostArchiveMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('site', 'Сайт'), ('group', 'Группа'), ('author', 'Автор')], max_length=6, verbose_name='Область')),
+                ('scope_id', models.PositiveIntegerField(default=0, verbose_name='id группы или автора')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='Год')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='Месяц')),
+                ('post_count', models.IntegerField(default=0, verbose_name='Число постов')),
+            ],
+            options={
+                'verbose_name': 'Post archive month',
+                'verbose_name_plural': 'Post archive months',
+                'ordering': ('-year', '-month'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['pub_date', 'id'], name='post_pub_date'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['group', 'pub_date', 'id'], name='post_group_pub_date'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='post_author_pub_date'),
+        ),
+        migrations.AddConstraint(
+            model_name='postarchivemonth',
+            constraint=models.UniqueConstraint(fields=('scope', 'scope_id', 'year', 'month'), name='unique_archive_month'),
+        ),
+    ]
@@ -1,11 +1,23 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import F, Q
 
+from core.storage import ContentAddressedStorage
+
+from .utils import make_excerpt
+
 User = get_user_model()
 
 
+class VisibleGroupManager(models.Manager):
+    """Группы без отметки об удалении."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
 class Group(models.Model):
     title = models.CharField(
         max_length=200,
@@ -21,16 +33,57 @@ class Group(models.Model):
         verbose_name="Описание группы",
         help_text="Введите описание группы",
     )
+    deleted_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Дата удаления",
+        help_text="Группа скрыта и ждет удаления командой purge_deleted",
+    )
+
+    objects = VisibleGroupManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.update_excerpt()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def visible(self):
+        """
+        Посты без отметки об удалении от активных авторов. Условие
+        deleted_at IS NULL совпадает с условием частичных индексов лент.
+        """
+        return self.filter(deleted_at=None, author__is_active=True)
+
+
+class VisiblePostManager(models.Manager.from_queryset(PostQuerySet)):
+    def get_queryset(self):
+        return super().get_queryset().visible()
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name="Текст нового поста",
         help_text="Введите текст нового поста",
     )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Анонс поста",
+        help_text="Начало текста поста для отображения в лентах",
+    )
+    excerpt_truncated = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name="Анонс обрезан",
+    )
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name="Дата публикации",
@@ -54,19 +107,72 @@ class Post(models.Model):
     image = models.ImageField(
         verbose_name="Картинка",
         upload_to="posts/",
+        storage=ContentAddressedStorage(),
         blank=True,
         null=True,
         help_text="Выберите картинку",
     )
 
+    deleted_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        verbose_name="Дата удаления",
+        help_text="Пост скрыт и ждет удаления командой purge_deleted",
+    )
+
+    # Посты, удаленные мягко или принадлежащие удаленным пользователям,
+    # видны только через all_objects.
+    objects = VisiblePostManager()
+    all_objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ("-pub_date",)
         verbose_name = "Post"
         verbose_name_plural = "Posts"
+        # Ленты и архивы идут по (pub_date, id) от новых к старым и
+        # только по видимым постам, поэтому индексы частичные.
+        indexes = [
+            models.Index(
+                fields=["pub_date", "id"],
+                name="post_pub_date",
+                condition=Q(deleted_at=None),
+            ),
+            models.Index(
+                fields=["group", "pub_date", "id"],
+                name="post_group_pub_date",
+                condition=Q(deleted_at=None),
+            ),
+            models.Index(
+                fields=["author", "pub_date", "id"],
+                name="post_author_pub_date",
+                condition=Q(deleted_at=None),
+            ),
+            models.Index(
+                fields=["deleted_at"],
+                name="post_deleted",
+                condition=Q(deleted_at__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def update_excerpt(self):
+        self.excerpt, self.excerpt_truncated = make_excerpt(
+            self.text, settings.POST_EXCERPT_LENGTH
+        )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "text" in update_fields:
+            self.update_excerpt()
+            if update_fields is not None:
+                kwargs["update_fields"] = {
+                    *update_fields, "excerpt", "excerpt_truncated"
+                }
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -139,3 +245,318 @@ class Follow(models.Model):
     def clean(self):
         if self.user == self.author:
             raise ValidationError("User can not follow himself")
+
+
+class TrendingPost(models.Model):
+    """
+    Рейтинг популярных постов. Таблицу целиком пересчитывает команда
+    compute_trending, лента "Популярное" только читает ее по rank.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="trending",
+        verbose_name="Пост",
+    )
+    rank = models.PositiveIntegerField(
+        unique=True,
+        verbose_name="Место в рейтинге",
+    )
+    score = models.FloatField(verbose_name="Оценка популярности")
+    computed = models.DateTimeField(verbose_name="Дата расчета")
+
+    class Meta:
+        ordering = ("rank",)
+        verbose_name = "Trending post"
+        verbose_name_plural = "Trending posts"
+
+    def __str__(self):
+        return f"{self.rank}: {self.post_id}"
+
+
+class FollowSuggestion(models.Model):
+    """
+    Рекомендация подписки. Для каждого пользователя хранятся лучшие
+    FOLLOW_SUGGESTIONS_COUNT авторов, таблицу пересчитывает команда
+    compute_follow_suggestions.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="follow_suggestions",
+        verbose_name="Пользователь",
+    )
+    suggested = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Рекомендованный автор",
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name="Место")
+    score = models.FloatField(verbose_name="Оценка")
+    computed = models.DateTimeField(verbose_name="Дата расчета")
+
+    class Meta:
+        ordering = ("user", "rank")
+        verbose_name = "Follow suggestion"
+        verbose_name_plural = "Follow suggestions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "rank"], name="unique_suggestion_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.suggested_id}"
+
+
+class PostArchiveMonth(models.Model):
+    """
+    Число постов за месяц для всего сайта, группы или автора. Обновляется
+    сигналами при создании, переносе и удалении постов, пересчитывается
+    командой rebuild_post_archive.
+    """
+    SITE = "site"
+    GROUP = "group"
+    AUTHOR = "author"
+    SCOPES = (
+        (SITE, "Сайт"),
+        (GROUP, "Группа"),
+        (AUTHOR, "Автор"),
+    )
+
+    scope = models.CharField(
+        max_length=6,
+        choices=SCOPES,
+        verbose_name="Область",
+    )
+    scope_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name="id группы или автора",
+    )
+    year = models.PositiveSmallIntegerField(verbose_name="Год")
+    month = models.PositiveSmallIntegerField(verbose_name="Месяц")
+    post_count = models.IntegerField(
+        default=0,
+        verbose_name="Число постов",
+    )
+
+    class Meta:
+        ordering = ("-year", "-month")
+        verbose_name = "Post archive month"
+        verbose_name_plural = "Post archive months"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "scope_id", "year", "month"],
+                name="unique_archive_month",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.scope} {self.scope_id}: "
+            f"{self.year}-{self.month:02}: {self.post_count}"
+        )
+
+
+class Notification(models.Model):
+    """
+    Уведомление о новом комментарии к посту или новом подписчике. Число
+    непрочитанных уведомлений хранится в кеше, см. posts.notifications.
+    """
+    COMMENT = "comment"
+    FOLLOW = "follow"
+    KINDS = (
+        (COMMENT, "Комментарий"),
+        (FOLLOW, "Подписка"),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="notifications",
+        verbose_name="Получатель",
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="+",
+        verbose_name="Кто совершил действие",
+    )
+    kind = models.CharField(
+        max_length=7,
+        choices=KINDS,
+        verbose_name="Тип",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        verbose_name="Пост",
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        verbose_name="Комментарий",
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата уведомления",
+    )
+    is_read = models.BooleanField(
+        default=False,
+        verbose_name="Прочитано",
+    )
+
+    class Meta:
+        ordering = ("-created", "-pk")
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        indexes = [
+            models.Index(
+                fields=["recipient", "-created"],
+                name="notification_inbox",
+            ),
+            models.Index(
+                fields=["recipient", "is_read"],
+                name="notification_unread",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.actor_id} -> {self.recipient_id}"
+
+
+class UserDeletion(models.Model):
+    """
+    Очередь удаления пользователей. Пользователь сразу становится
+    неактивным, а его посты, комментарии и подписки пачками удаляет
+    команда purge_deleted.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="deletion",
+        verbose_name="Пользователь",
+    )
+    requested = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата запроса",
+    )
+
+    class Meta:
+        ordering = ("requested",)
+        verbose_name = "User deletion"
+        verbose_name_plural = "User deletions"
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class VisibleArchivedPostManager(models.Manager):
+    """Архивные посты активных авторов."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(author__is_active=True)
+
+
+class ArchivedPost(models.Model):
+    """
+    Пост, перенесенный командой archive_old_posts из Post в архивную
+    таблицу. id сохраняется, поэтому адрес поста не меняется. Поля
+    совпадают с полями Post, нужными для показа, и шаблоны работают с
+    архивными постами так же, как с обычными.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name="Текст поста")
+    excerpt = models.TextField(blank=True, verbose_name="Анонс поста")
+    excerpt_truncated = models.BooleanField(
+        default=False,
+        verbose_name="Анонс обрезан",
+    )
+    pub_date = models.DateTimeField(verbose_name="Дата публикации")
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_posts",
+        verbose_name="Автор поста",
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="archived_posts",
+        verbose_name="Группа",
+    )
+    image = models.ImageField(
+        verbose_name="Картинка",
+        upload_to="posts/",
+        storage=ContentAddressedStorage(),
+        blank=True,
+        null=True,
+    )
+    archived = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Дата переноса в архив",
+    )
+
+    objects = VisibleArchivedPostManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        ordering = ("-pub_date",)
+        verbose_name = "Archived post"
+        verbose_name_plural = "Archived posts"
+        indexes = [
+            models.Index(
+                fields=["pub_date", "id"], name="archived_post_pub_date"
+            ),
+            models.Index(
+                fields=["group", "pub_date", "id"],
+                name="archived_post_group_date",
+            ),
+            models.Index(
+                fields=["author", "pub_date", "id"],
+                name="archived_post_author_date",
+            ),
+        ]
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий архивного поста."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name="comments",
+        verbose_name="Пост, к которому относится комментарий",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="archived_comments",
+        verbose_name="Автор комментария",
+    )
+    text = models.TextField(verbose_name="Текст комментария")
+    created = models.DateTimeField(
+        verbose_name="Дата публикации комментария",
+    )
+
+    class Meta:
+        ordering = ("-created",)
+        verbose_name = "Archived comment"
+        verbose_name_plural = "Archived comments"
+
+    def __str__(self):
+        return self.text[:15]
@@ -0,0 +1,62 @@
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Comment, Notification, Post
+
+UNREAD_COUNT_KEY = "notifications_unread:{}"
+
+
+def notify(recipient, actor, kind: str, post: Optional[Post] = None,
+           comment: Optional[Comment] = None) -> Optional[Notification]:
+    """
+    Создает уведомление и увеличивает счетчик непрочитанных в кеше.
+    О собственных действиях пользователь не уведомляется.
+    """
+    if recipient.pk == actor.pk:
+        return None
+    notification = Notification.objects.create(
+        recipient=recipient, actor=actor, kind=kind,
+        post=post, comment=comment,
+    )
+    try:
+        cache.incr(UNREAD_COUNT_KEY.format(recipient.pk))
+    except ValueError:
+        # Счетчика нет в кеше - его посчитает следующее чтение.
+        pass
+    return notification
+
+
+def get_unread_count(user_id: int) -> int:
+    """Число непрочитанных уведомлений; запрос к базе - только без кеша."""
+    key = UNREAD_COUNT_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        # Уведомления от удаленных пользователей не показываются в списке
+        # и не учитываются в счетчике.
+        count = Notification.objects.filter(
+            recipient_id=user_id, is_read=False, actor__is_active=True
+        ).count()
+        cache.add(key, count, settings.NOTIFICATION_COUNT_TIMEOUT)
+    return count
+
+
+def mark_all_read(user_id: int) -> int:
+    """Отмечает все уведомления прочитанными и обнуляет счетчик."""
+    updated = Notification.objects.filter(
+        recipient_id=user_id, is_read=False
+    ).update(is_read=True)
+    cache.set(
+        UNREAD_COUNT_KEY.format(user_id), 0,
+        settings.NOTIFICATION_COUNT_TIMEOUT,
+    )
+    return updated
+
+
+def reset_unread_counts(user_ids: Iterable[int]) -> None:
+    """
+    Сбрасывает счетчики непрочитанных после удаления уведомлений в обход
+    notify и mark_all_read; их посчитает следующее чтение.
+    """
+    cache.delete_many([UNREAD_COUNT_KEY.format(pk) for pk in set(user_ids)])
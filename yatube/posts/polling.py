@@ -0,0 +1,94 @@
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+
+from .utils import make_keyset_cursor, parse_keyset_cursor
+
+FEED_HEAD_KEY = "feed_head:{}"
+
+Position = Tuple[datetime, int]
+
+
+def get_feed_scopes(post) -> List[str]:
+    """
+    Ленты, в которые входит пост. Группа и автор указаны по slug и имени,
+    чтобы опрос ленты не искал их в базе.
+    """
+    scopes = ["site", f"author:{post.author.username}"]
+    if post.group_id is not None:
+        scopes.append(f"group:{post.group.slug}")
+    return scopes
+
+
+def get_feed_head(scope: str, posts: QuerySet) -> Optional[Position]:
+    """
+    Позиция самого нового поста ленты. Хранится в кеше; при промахе
+    берется одним запросом по индексу (pub_date, id). None - лента пуста.
+    """
+    key = FEED_HEAD_KEY.format(scope)
+    head = cache.get(key)
+    if head is None:
+        newest = posts.order_by("-pub_date", "-pk").only("pub_date").first()
+        head = make_keyset_cursor(newest) if newest else ""
+        cache.add(key, head, settings.FEED_HEAD_TIMEOUT)
+    return parse_keyset_cursor(head) if head else None
+
+
+def advance_feed_heads(post) -> None:
+    """Сдвигает позиции лент нового поста, если он новее сохраненных."""
+    keys = [FEED_HEAD_KEY.format(scope) for scope in get_feed_scopes(post)]
+    cached = cache.get_many(keys)
+    position = (post.pub_date, post.pk)
+    cursor = make_keyset_cursor(post)
+    cache.set_many(
+        {
+            key: cursor for key in keys
+            if key not in cached
+            or not cached[key]
+            or parse_keyset_cursor(cached[key]) < position
+        },
+        settings.FEED_HEAD_TIMEOUT,
+    )
+
+
+def reset_feed_heads(scopes: Iterable[str]) -> None:
+    """Сбрасывает позиции лент; их пересчитает следующий опрос."""
+    cache.delete_many([FEED_HEAD_KEY.format(scope) for scope in scopes])
+
+
+def newer_posts(posts: QuerySet, since: Position) -> List:
+    """
+    Посты новее позиции since от новых к старым, не больше
+    NEW_POSTS_LIMIT: только id и дата, один запрос по индексу.
+    """
+    pub_date, pk = since
+    newer = posts.filter(
+        Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+    )
+    return list(
+        newer.order_by("-pub_date", "-pk")
+        .only("pub_date")[:settings.NEW_POSTS_LIMIT]
+    )
+
+
+def poll_feed(scope: Optional[str], posts: QuerySet, since: Position,
+              cursor: str) -> dict:
+    """
+    Ответ на опрос ленты: число и id постов новее since и позиция для
+    следующего опроса. Если позиция ленты в кеше не новее since, ответ
+    собирается без запросов. Для ленты без позиции (scope=None) сразу
+    выполняется запрос.
+    """
+    if scope is not None:
+        head = get_feed_head(scope, posts)
+        if head is None or head <= since:
+            return {"count": 0, "ids": [], "cursor": cursor}
+    found = newer_posts(posts, since)
+    return {
+        "count": len(found),
+        "ids": [post.pk for post in found],
+        "cursor": make_keyset_cursor(found[0]) if found else cursor,
+    }
@@ -0,0 +1,191 @@
+import time
+from collections import Counter, defaultdict
+from typing import List
+
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from . import archive, feeds, notifications, polling
+from .models import (ArchivedComment, ArchivedPost, Comment, Follow,
+                     FollowSuggestion, Group, Notification, Post, UserDeletion)
+from .queries import invalidate_cached_posts, invalidate_group_directory
+
+
+def soft_delete_post(post: Post) -> None:
+    """Скрывает пост сразу; удалит его purge_deleted."""
+    post.deleted_at = timezone.now()
+    post.save(update_fields=["deleted_at"])
+
+
+def soft_delete_group(group: Group) -> None:
+    """
+    Скрывает группу сразу; purge_deleted пачками отвяжет от нее посты и
+    удалит ее.
+    """
+    group.deleted_at = timezone.now()
+    group.save(update_fields=["deleted_at"])
+
+
+def soft_delete_user(user) -> None:
+    """
+    Делает пользователя неактивным и ставит в очередь удаления. Посты
+    неактивных авторов скрыты менеджером Post.objects.
+    """
+    user.is_active = False
+    user.save(update_fields=["is_active"])
+    UserDeletion.objects.get_or_create(user=user)
+    notifications.reset_unread_counts(
+        Notification.objects.filter(actor=user, is_read=False)
+        .values_list("recipient_id", flat=True)
+    )
+    invalidate_cached_posts(
+        Post.all_objects.filter(author=user).values_list("pk", flat=True)
+    )
+    feeds.bump_feed_versions(user.pk, ())
+    invalidate_group_directory()
+
+
+def delete_in_batches(queryset: QuerySet, batch_size: int,
+                      pause: float = 0) -> int:
+    """
+    Удаляет строки queryset пачками по batch_size, каждую в своей
+    транзакции. Между пачками - пауза, чтобы запись на сайте не ждала
+    блокировку базы.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            batch = queryset.model._base_manager.filter(pk__in=pks)
+            recipients = unread_recipients(queryset.model, pks)
+            if queryset.model in (Post, ArchivedPost):
+                delete_posts(list(batch.select_related("author", "group")))
+            else:
+                batch.delete()
+            notifications.reset_unread_counts(recipients)
+        deleted += len(pks)
+        time.sleep(pause)
+
+
+def unread_recipients(model, pks) -> List[int]:
+    """
+    Получатели непрочитанных уведомлений, которые удалятся вместе со
+    строками model с id из pks.
+    """
+    if model is Notification:
+        lookup = Q(pk__in=pks)
+    elif model is Comment:
+        lookup = Q(comment_id__in=pks)
+    elif model is Post:
+        lookup = Q(post_id__in=pks) | Q(comment__post_id__in=pks)
+    else:
+        return []
+    unread = Notification.objects.filter(lookup, is_read=False)
+    return list(unread.values_list("recipient_id", flat=True).distinct())
+
+
+def delete_posts(posts: List) -> None:
+    """
+    Удаляет пачку постов или архивных постов. Счетчики архива, версии и
+    позиции лент обновляются один раз на пачку, а не сигналами для
+    каждого поста.
+    """
+    if not posts:
+        return
+    counts = Counter()
+    group_ids = defaultdict(set)
+    feed_scopes = set()
+    for post in posts:
+        post._rollups_in_batch = True
+        if isinstance(post, Post):
+            group_ids[post.author_id].add(post.group_id)
+            if post.deleted_at is not None:
+                # Скрытый пост уже вычтен из счетчиков при мягком удалении.
+                continue
+            feed_scopes.update(polling.get_feed_scopes(post))
+        year, month = archive.get_month(post.pub_date)
+        for scope in archive.get_post_scopes(post.author_id, post.group_id):
+            counts[scope + (year, month)] += 1
+
+    collector = Collector(using=posts[0]._state.db)
+    collector.collect(posts)
+    collector.delete()
+
+    for author_id, ids in group_ids.items():
+        feeds.bump_feed_versions(author_id, ids)
+    polling.reset_feed_heads(feed_scopes)
+    for (scope, scope_id, year, month), count in counts.items():
+        archive.change_post_count(
+            [(scope, scope_id)], year, month, -count
+        )
+
+
+def detach_in_batches(queryset: QuerySet, batch_size: int,
+                      pause: float = 0) -> int:
+    """Отвязывает посты от группы пачками - то же, что SET_NULL."""
+    detached = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return detached
+            queryset.model._base_manager.filter(pk__in=pks).update(
+                group=None
+            )
+            invalidate_cached_posts(pks)
+        detached += len(pks)
+        time.sleep(pause)
+
+
+def purge_deleted(batch_size: int, pause: float = 0) -> Counter:
+    """
+    Удаляет скрытые посты, группы и пользователей из очереди. Зависимые
+    строки удаляются пачками до удаления самого объекта, поэтому каскад
+    при удалении объекта уже почти пустой. Возвращает число удаленных
+    строк по видам.
+    """
+    purged = Counter()
+    purged["comments"] += delete_in_batches(
+        Comment.objects.filter(post__deleted_at__isnull=False),
+        batch_size, pause,
+    )
+    purged["posts"] += delete_in_batches(
+        Post.all_objects.filter(deleted_at__isnull=False), batch_size, pause
+    )
+
+    for group in Group.all_objects.filter(deleted_at__isnull=False):
+        for posts in (Post.all_objects, ArchivedPost.all_objects):
+            purged["detached posts"] += detach_in_batches(
+                posts.filter(group=group), batch_size, pause
+            )
+        group.delete()
+        purged["groups"] += 1
+
+    for deletion in UserDeletion.objects.select_related("user"):
+        user = deletion.user
+        dependent = {
+            "follows": Follow.objects.filter(Q(user=user) | Q(author=user)),
+            "notifications": Notification.objects.filter(
+                Q(recipient=user) | Q(actor=user)
+            ),
+            "follow suggestions": FollowSuggestion.objects.filter(
+                Q(user=user) | Q(suggested=user)
+            ),
+            "comments": Comment.objects.filter(
+                Q(author=user) | Q(post__author=user)
+            ),
+            "posts": Post.all_objects.filter(author=user),
+            "archived comments": ArchivedComment.objects.filter(
+                Q(author=user) | Q(post__author=user)
+            ),
+            "archived posts": ArchivedPost.all_objects.filter(author=user),
+        }
+        for name, queryset in dependent.items():
+            purged[name] += delete_in_batches(queryset, batch_size, pause)
+        user.delete()
+        purged["users"] += 1
+    return purged
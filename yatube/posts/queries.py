@@ -0,0 +1,172 @@
+from typing import Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (Count, IntegerField, Max, OuterRef, Q, QuerySet,
+                              Subquery)
+from django.db.models.functions import Coalesce
+
+from .models import ArchivedPost, FollowSuggestion, Group, Post
+from .utils import ChainedQuerySet
+
+GROUP_DIRECTORY_CACHE_KEY = "group_directory"
+POST_CACHE_KEY = "post:{}"
+# Поля автора, которые выводятся на странице поста. Хеш пароля и другие
+# учетные данные в кеш постов не попадают.
+CACHED_AUTHOR_FIELDS = ("username", "first_name", "last_name", "is_active")
+
+# Колонки, которые отображаются в карточке поста в ленте. Полный текст
+# поста не загружается - вместо него выводится сохраненный анонс.
+FEED_POST_FIELDS = (
+    "excerpt",
+    "excerpt_truncated",
+    "pub_date",
+    "image",
+    "author",
+    "author__username",
+    "author__first_name",
+    "author__last_name",
+    "group",
+    "group__slug",
+    "group__deleted_at",
+)
+
+
+def feed_posts() -> QuerySet:
+    """Базовый запрос для всех лент: только отображаемые колонки."""
+    return (Post.objects
+                .select_related("author", "group")
+                .only(*FEED_POST_FIELDS))
+
+
+def index_feed() -> QuerySet:
+    return feed_posts()
+
+
+def group_feed(group) -> QuerySet:
+    return feed_posts().filter(group=group)
+
+
+def profile_feed(author) -> QuerySet:
+    return feed_posts().filter(author=author)
+
+
+def archived_feed_posts() -> QuerySet:
+    """Архивные посты с теми же колонками, что и в лентах."""
+    posts = ArchivedPost.objects.select_related("author", "group")
+    return posts.only(*FEED_POST_FIELDS)
+
+
+def index_with_archive() -> ChainedQuerySet:
+    return ChainedQuerySet(index_feed(), archived_feed_posts())
+
+
+def group_with_archive(group) -> ChainedQuerySet:
+    return ChainedQuerySet(
+        group_feed(group), archived_feed_posts().filter(group=group)
+    )
+
+
+def profile_with_archive(author) -> ChainedQuerySet:
+    return ChainedQuerySet(
+        profile_feed(author), archived_feed_posts().filter(author=author)
+    )
+
+
+def follow_feed(user) -> QuerySet:
+    return feed_posts().filter(author__following__user=user)
+
+
+def trending_feed() -> QuerySet:
+    """Посты из рейтинга TrendingPost в порядке мест."""
+    return feed_posts().filter(trending__isnull=False).order_by(
+        "trending__rank"
+    )
+
+
+def follow_suggestions(user) -> QuerySet:
+    """
+    Рекомендованные пользователю авторы из заранее рассчитанной таблицы,
+    без тех, на кого он подписался после расчета.
+    """
+    suggestions = FollowSuggestion.objects.filter(
+        user=user, suggested__is_active=True
+    ).exclude(suggested__following__user=user)
+    return suggestions.select_related("suggested").only(
+        "user",
+        "suggested__username",
+        "suggested__first_name",
+        "suggested__last_name",
+    ).order_by("rank")
+
+
+def group_directory() -> List[dict]:
+    """
+    Группы со статистикой: число постов, дата последнего поста и его
+    автор. Считается одним запросом и хранится в кеше до изменения
+    постов или групп, см. posts.signals.
+    """
+    groups = cache.get(GROUP_DIRECTORY_CACHE_KEY)
+    if groups is None:
+        latest_post = Post.objects.filter(group=OuterRef("pk")).order_by(
+            "-pub_date", "-pk"
+        )
+        visible = Q(posts__deleted_at=None, posts__author__is_active=True)
+        archived_count = (
+            ArchivedPost.objects
+            .filter(group=OuterRef("pk"))
+            .order_by()
+            .values("group")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        groups = Group.objects.annotate(
+            post_count=Count("posts", filter=visible) + Coalesce(
+                Subquery(archived_count, output_field=IntegerField()), 0
+            ),
+            last_post_date=Max("posts__pub_date", filter=visible),
+            last_poster=Subquery(latest_post.values("author__username")[:1]),
+        )
+        groups = list(groups.order_by("title").values(
+            "title", "slug", "description", "post_count", "last_post_date",
+            "last_poster",
+        ))
+        cache.set(
+            GROUP_DIRECTORY_CACHE_KEY, groups,
+            settings.GROUP_DIRECTORY_CACHE_TIMEOUT,
+        )
+    return groups
+
+
+def invalidate_group_directory() -> None:
+    cache.delete(GROUP_DIRECTORY_CACHE_KEY)
+
+
+def get_cached_post(pk: int) -> Post:
+    """
+    Видимый пост с автором и группой по pk через кеш. У автора читаются
+    только поля из CACHED_AUTHOR_FIELDS. Отсутствующий id
+    тоже кешируется, на POST_CACHE_MISS_TIMEOUT секунд. Кеш сбрасывается
+    при сохранении и удалении поста, см. posts.signals. Если поста нет,
+    выбрасывает Post.DoesNotExist.
+    """
+    key = POST_CACHE_KEY.format(pk)
+    post = cache.get(key)
+    if post is None:
+        fields = [field.name for field in Post._meta.concrete_fields]
+        fields += [f"author__{field}" for field in CACHED_AUTHOR_FIELDS]
+        posts = Post.objects.select_related("author", "group").only(*fields)
+        post = posts.filter(pk=pk).first()
+        if post is None:
+            cache.set(key, False, settings.POST_CACHE_MISS_TIMEOUT)
+        else:
+            cache.set(key, post, settings.POST_CACHE_TIMEOUT)
+    if not post:
+        raise Post.DoesNotExist(f"Post {pk} does not exist.")
+    return post
+
+
+def invalidate_cached_posts(pks: Iterable[int]) -> None:
+    keys = [POST_CACHE_KEY.format(pk) for pk in pks]
+    for start in range(0, len(keys), 1000):
+        cache.delete_many(keys[start:start + 1000])
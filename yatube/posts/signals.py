@@ -0,0 +1,193 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import archive, feeds, polling
+from .models import ArchivedPost, Group, Post, PostArchiveMonth
+from .queries import (CACHED_AUTHOR_FIELDS, invalidate_cached_posts,
+                      invalidate_group_directory)
+
+User = get_user_model()
+
+
+def release_image(image):
+    """Освобождает ссылку на файл картинки после фиксации транзакции."""
+    if image:
+        storage, name = image.storage, image.name
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(pre_save, sender=Post)
+def remember_replaced_image(sender, instance, raw, update_fields, **kwargs):
+    if (
+        raw
+        or instance.pk is None
+        or (update_fields is not None and "image" not in update_fields)
+    ):
+        return
+    previous = (Post.all_objects
+                    .filter(pk=instance.pk)
+                    .values_list("image", flat=True)
+                    .first())
+    if previous and previous != instance.image.name:
+        instance._replaced_image = previous
+
+
+@receiver(post_save, sender=Post)
+def release_replaced_image(sender, instance, **kwargs):
+    # Ссылка освобождается только после UPDATE: если сохранение не
+    # удалось, пост продолжает ссылаться на существующий файл.
+    previous = instance.__dict__.pop("_replaced_image", None)
+    if previous:
+        release_image(Post(image=previous).image)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def release_deleted_image(sender, instance, **kwargs):
+    release_image(instance.image)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_group_directory(sender, **kwargs):
+    invalidate_group_directory()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_cached_post(sender, instance, **kwargs):
+    invalidate_cached_posts([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def reset_cached_author_posts(sender, instance, created, raw, update_fields,
+                              **kwargs):
+    if (
+        created
+        or raw
+        or (update_fields is not None
+            and not set(update_fields) & set(CACHED_AUTHOR_FIELDS))
+    ):
+        return
+    posts = Post.all_objects.filter(author=instance)
+    invalidate_cached_posts(posts.values_list("pk", flat=True))
+    # Имя автора выводится в заголовке его ленты и в записях всех лент с
+    # его постами.
+    group_ids = posts.order_by().values_list("group_id", flat=True)
+    feeds.bump_feed_versions(instance.pk, set(group_ids.distinct()))
+
+
+@receiver(post_save, sender=Group)
+def bump_group_feed_version(sender, instance, raw, **kwargs):
+    # Название и описание группы выводятся в ее ленте.
+    if not raw:
+        feeds.set_feed_versions([f"group:{instance.pk}"])
+
+
+@receiver(post_save, sender=Group)
+def reset_cached_group_posts(sender, instance, created, raw, **kwargs):
+    if created or raw:
+        return
+    invalidate_cached_posts(
+        Post.all_objects.filter(group=instance).values_list("pk", flat=True)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_group(sender, instance, raw, update_fields, **kwargs):
+    if (
+        raw
+        or instance.pk is None
+        or (update_fields is not None and "group" not in update_fields)
+    ):
+        return
+    instance._previous_group_id = (Post.all_objects
+                                       .filter(pk=instance.pk)
+                                       .values_list("group_id", flat=True)
+                                       .first())
+
+
+@receiver(post_save, sender=Post)
+def update_saved_post_rollups(sender, instance, created, raw, update_fields,
+                              **kwargs):
+    if raw:
+        return
+    year, month = archive.get_month(instance.pub_date)
+    previous_group_id = instance.__dict__.pop(
+        "_previous_group_id", instance.group_id
+    )
+    feeds.bump_feed_versions(
+        instance.author_id, {previous_group_id, instance.group_id}
+    )
+    if update_fields is not None and "deleted_at" in update_fields:
+        # Мягкое удаление или восстановление поста.
+        polling.reset_feed_heads(polling.get_feed_scopes(instance))
+        archive.change_post_count(
+            archive.get_post_scopes(instance.author_id, instance.group_id),
+            year, month, -1 if instance.deleted_at else 1,
+        )
+        return
+    if created:
+        polling.advance_feed_heads(instance)
+        archive.change_post_count(
+            archive.get_post_scopes(instance.author_id, instance.group_id),
+            year, month, 1,
+        )
+        return
+    if previous_group_id != instance.group_id:
+        polling.advance_feed_heads(instance)
+        if previous_group_id is not None:
+            previous_group = Group.objects.filter(pk=previous_group_id)
+            polling.reset_feed_heads([
+                f"group:{slug}"
+                for slug in previous_group.values_list("slug", flat=True)
+            ])
+            archive.change_post_count(
+                [(PostArchiveMonth.GROUP, previous_group_id)],
+                year, month, -1,
+            )
+        if instance.group_id is not None:
+            archive.change_post_count(
+                [(PostArchiveMonth.GROUP, instance.group_id)],
+                year, month, 1,
+            )
+
+
+@receiver(post_delete, sender=Post)
+def update_deleted_post_rollups(sender, instance, **kwargs):
+    if getattr(instance, "_rollups_in_batch", False):
+        # Пачку постов учитывает purge.delete_posts.
+        return
+    feeds.bump_feed_versions(instance.author_id, {instance.group_id})
+    if instance.deleted_at is not None:
+        # Скрытый пост уже вычтен из счетчиков при мягком удалении.
+        return
+    polling.reset_feed_heads(polling.get_feed_scopes(instance))
+    year, month = archive.get_month(instance.pub_date)
+    archive.change_post_count(
+        archive.get_post_scopes(instance.author_id, instance.group_id),
+        year, month, -1,
+    )
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def update_deleted_archived_post_rollups(sender, instance, **kwargs):
+    if getattr(instance, "_rollups_in_batch", False):
+        return
+    year, month = archive.get_month(instance.pub_date)
+    archive.change_post_count(
+        archive.get_post_scopes(instance.author_id, instance.group_id),
+        year, month, -1,
+    )
+
+
+@receiver(post_delete, sender=Group)
+def delete_group_archive(sender, instance, **kwargs):
+    # Посты группы остаются без группы через UPDATE, без сигналов.
+    PostArchiveMonth.objects.filter(
+        scope=PostArchiveMonth.GROUP, scope_id=instance.pk
+    ).delete()
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Iterator, NamedTuple, Tuple
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Max, QuerySet, Sum
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, Post
+
+User = get_user_model()
+
+INDEX_NAME = "sitemap.xml"
+SHARD_NAME = "sitemap-{}-{}.xml"
+MANIFEST_NAME = "sitemap-manifest.json"
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+class Section(NamedTuple):
+    """
+    Раздел карты сайта: строки queryset разбиваются на шарды по диапазонам
+    pk, fields - поля, которые читает location.
+    """
+    name: str
+    queryset: Callable[[], QuerySet]
+    fields: Tuple[str, ...]
+    location: Callable[[tuple], str]
+    lastmod_field: str = ""
+
+
+SECTIONS = (
+    Section(
+        "posts",
+        lambda: Post.objects.all(),
+        ("pk", "pub_date"),
+        lambda row: reverse("posts:post_detail", args=(row[0],)),
+        "pub_date",
+    ),
+    Section(
+        "archived-posts",
+        lambda: ArchivedPost.objects.all(),
+        ("pk", "pub_date"),
+        lambda row: reverse("posts:post_detail", args=(row[0],)),
+        "pub_date",
+    ),
+    Section(
+        "groups",
+        lambda: Group.objects.all(),
+        ("pk", "slug"),
+        lambda row: reverse("posts:group_list", args=(row[1],)),
+    ),
+    Section(
+        "profiles",
+        lambda: User.objects.filter(is_active=True),
+        ("pk", "username"),
+        lambda row: reverse("posts:profile", args=(row[1],)),
+    ),
+)
+
+
+def shard_fingerprints(section: Section, size: int) -> Dict[int, list]:
+    """
+    Отпечатки всех шардов раздела одним запросом с группировкой по номеру
+    шарда. Отпечаток - число строк, сумма их pk и, если есть, последняя
+    дата: добавление или удаление строки в диапазоне меняет сумму pk.
+    """
+    aggregates = {"count": Count("pk"), "pk_sum": Sum("pk")}
+    if section.lastmod_field:
+        aggregates["last"] = Max(section.lastmod_field)
+    rows = (
+        section.queryset()
+        .order_by()
+        .annotate(shard=(F("pk") - 1) / size)
+        .values("shard")
+        .annotate(**aggregates)
+    )
+    fingerprints = {}
+    for row in rows:
+        last = row.get("last")
+        fingerprints[row["shard"]] = [
+            row["count"], row["pk_sum"], last.isoformat() if last else None,
+        ]
+    return fingerprints
+
+
+def iter_urls(section: Section, shard: int, size: int,
+              base_url: str) -> Iterator[str]:
+    """Элементы <url> шарда; строки читаются из базы потоком."""
+    rows = (
+        section.queryset()
+        .filter(pk__gt=shard * size, pk__lte=(shard + 1) * size)
+        .order_by("pk")
+        .values_list(*section.fields)
+        .iterator(chunk_size=2000)
+    )
+    for row in rows:
+        loc = escape(base_url + section.location(row))
+        if section.lastmod_field:
+            lastmod = timezone.localtime(row[-1]).isoformat()
+            loc = f"{loc}</loc><lastmod>{lastmod}"
+        yield f"<url><loc>{loc}</loc></url>\n"
+
+
+def write_atomic(path: str, chunks: Iterator[str]) -> None:
+    """
+    Пишет файл во временный рядом и переименовывает его, поэтому
+    веб-сервер никогда не отдает недописанную карту.
+    """
+    descriptor, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+            file.writelines(chunks)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_shard(path: str, urls: Iterator[str]) -> None:
+    write_atomic(path, _wrap("urlset", urls))
+
+
+def _wrap(tag: str, body: Iterator[str]) -> Iterator[str]:
+    yield XML_HEADER
+    yield f'<{tag} xmlns="{XMLNS}">\n'
+    yield from body
+    yield f"</{tag}>\n"
+
+
+def load_manifest(root: str) -> dict:
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def generate_sitemaps(root: str = None, base_url: str = None,
+                      shard_size: int = None,
+                      force: bool = False) -> Tuple[int, int]:
+    """
+    Обновляет файлы карты сайта в root. Переписываются только шарды, чей
+    отпечаток изменился с прошлого запуска, и индекс sitemap.xml, если
+    изменился хотя бы один шард. Переименование группы или пользователя
+    отпечаток не меняет - такие правки подхватывает запуск с force.
+    Возвращает число записанных и пропущенных шардов.
+    """
+    root = root or settings.SITEMAP_ROOT
+    base_url = (base_url or settings.SITEMAP_BASE_URL).rstrip("/")
+    shard_size = shard_size or settings.SITEMAP_SHARD_SIZE
+    os.makedirs(root, exist_ok=True)
+
+    manifest = load_manifest(root)
+    if (manifest.get("base_url"), manifest.get("shard_size")) != (
+        base_url, shard_size
+    ):
+        force = True
+    previous = {} if force else manifest.get("shards", {})
+    shards = {}
+    written = skipped = 0
+    for section in SECTIONS:
+        fingerprints = shard_fingerprints(section, shard_size)
+        for shard, fingerprint in sorted(fingerprints.items()):
+            name = SHARD_NAME.format(section.name, shard + 1)
+            path = os.path.join(root, name)
+            entry = previous.get(name)
+            if (entry and entry["fingerprint"] == fingerprint
+                    and os.path.exists(path)):
+                shards[name] = entry
+                skipped += 1
+                continue
+            write_shard(
+                path, iter_urls(section, shard, shard_size, base_url)
+            )
+            shards[name] = {
+                "fingerprint": fingerprint,
+                "lastmod": timezone.now().isoformat(),
+            }
+            written += 1
+
+    # Шарды, которые опустели или сменили размер, больше не нужны.
+    stale = set(manifest.get("shards", {})) - set(shards)
+    for name in stale:
+        try:
+            os.unlink(os.path.join(root, name))
+        except FileNotFoundError:
+            pass
+    index_path = os.path.join(root, INDEX_NAME)
+    if written or stale or not os.path.exists(index_path):
+        write_atomic(index_path, _wrap("sitemapindex", (
+            f"<sitemap><loc>{escape(f'{base_url}/{name}')}</loc>"
+            f"<lastmod>{entry['lastmod']}</lastmod></sitemap>\n"
+            for name, entry in shards.items()
+        )))
+    manifest = {
+        "base_url": base_url, "shard_size": shard_size, "shards": shards,
+    }
+    write_atomic(os.path.join(root, MANIFEST_NAME), [json.dumps(manifest)])
+    return written, skipped
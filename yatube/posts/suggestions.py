@@ -0,0 +1,98 @@
+from typing import Iterator, List, Tuple
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Follow, FollowSuggestion
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    np = sparse = None
+
+
+def load_follow_matrix():
+    """
+    Загружает таблицу Follow в разреженную матрицу: строка - подписчик,
+    столбец - автор. Возвращает матрицу и массив id пользователей, по
+    которому номер строки или столбца переводится обратно в id.
+    """
+    pairs = np.array(
+        Follow.objects.values_list("user_id", "author_id"), dtype=np.int64
+    ).reshape(-1, 2)
+    user_ids, indices = np.unique(pairs, return_inverse=True)
+    indices = indices.reshape(-1, 2)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32),
+         (indices[:, 0], indices[:, 1])),
+        shape=(len(user_ids), len(user_ids)),
+    )
+    return matrix, user_ids
+
+
+def score_chunk(follows, start: int, stop: int):
+    """
+    Оценки авторов для пользователей start..stop-1. Пользователи похожи,
+    если подписаны на одних и тех же авторов; автор получает от каждого
+    похожего подписчика вес, равный числу общих подписок. Авторы, на
+    которых пользователь уже подписан, и он сам исключаются.
+    """
+    rows = follows[start:stop]
+    scores = (rows @ follows.T) @ follows
+    own = sparse.csr_matrix(
+        (np.ones(stop - start, dtype=np.float32),
+         (np.arange(stop - start), np.arange(start, stop))),
+        shape=scores.shape,
+    )
+    scores = scores - scores.multiply(rows + own)
+    scores.eliminate_zeros()
+    return scores.tocsr()
+
+
+def top_k(scores, k: int) -> Iterator[Tuple[int, List[Tuple[int, float]]]]:
+    """Для каждой строки - до k столбцов с наибольшей оценкой."""
+    for row in range(scores.shape[0]):
+        begin, end = scores.indptr[row], scores.indptr[row + 1]
+        if begin == end:
+            continue
+        columns = scores.indices[begin:end]
+        values = scores.data[begin:end]
+        # Равные оценки упорядочены по номеру столбца, то есть по id.
+        order = np.lexsort((columns, -values))[:k]
+        yield row, list(zip(columns[order], values[order]))
+
+
+def rebuild_follow_suggestions(k: int, chunk_size: int) -> int:
+    """
+    Пересчитывает FollowSuggestion. Пользователи обрабатываются пачками
+    по chunk_size строк, поэтому в памяти одновременно находится только
+    матрица оценок одной пачки. Возвращает число сохраненных рекомендаций.
+    """
+    computed = timezone.now()
+    follows, user_ids = load_follow_matrix()
+    saved = 0
+    for start in range(0, follows.shape[0], chunk_size):
+        stop = min(start + chunk_size, follows.shape[0])
+        suggestions = [
+            FollowSuggestion(
+                user_id=int(user_ids[start + row]),
+                suggested_id=int(user_ids[column]),
+                rank=rank,
+                score=float(score),
+                computed=computed,
+            )
+            for row, top in top_k(score_chunk(follows, start, stop), k)
+            for rank, (column, score) in enumerate(top, start=1)
+        ]
+        with transaction.atomic():
+            # id в user_ids отсортированы, поэтому пачка - диапазон id.
+            FollowSuggestion.objects.filter(
+                user_id__gte=int(user_ids[start]),
+                user_id__lte=int(user_ids[stop - 1]),
+            ).delete()
+            FollowSuggestion.objects.bulk_create(suggestions)
+        saved += len(suggestions)
+    # Пользователи, у которых не осталось подписок.
+    FollowSuggestion.objects.filter(computed__lt=computed).delete()
+    return saved
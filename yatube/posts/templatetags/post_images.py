@@ -0,0 +1,28 @@
+from django import template
+from django.conf import settings
+
+from ..thumbnails import get_responsive_thumbnails
+
+register = template.Library()
+
+
+@register.inclusion_tag("posts/includes/post_image.html")
+def post_image(post, lazy=True):
+    """
+    Выводит картинку поста с набором уменьшенных копий в srcset, чтобы
+    браузер загружал копию по ширине экрана. Копии, заранее загруженные
+    prefetch_thumbnails, повторно не запрашиваются.
+    """
+    thumbnails = getattr(post, "thumbnails", None)
+    if thumbnails is None:
+        thumbnails = get_responsive_thumbnails(post.image)
+    if not thumbnails:
+        return {}
+    return {
+        "image": thumbnails[-1],
+        "srcset": ", ".join(
+            f"{thumbnail.url} {thumbnail.width}w" for thumbnail in thumbnails
+        ),
+        "sizes": settings.POST_IMAGE_SIZES_ATTRIBUTE,
+        "lazy": lazy,
+    }
@@ -0,0 +1,138 @@
+from datetime import datetime
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post, PostArchiveMonth
+from ..utils import parse_keyset_cursor
+
+User = get_user_model()
+
+
+def counters():
+    return set(PostArchiveMonth.objects.filter(post_count__gt=0).values_list(
+        "scope", "scope_id", "year", "month", "post_count"
+    ))
+
+
+class PostArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        cls.other_group = Group.objects.create(
+            title="Другая группа", slug="other_slug", description="Описание"
+        )
+
+    def create_post(self, year, month, day=1, group=None):
+        post = Post.objects.create(
+            text=f"Пост {year}-{month}-{day}", author=self.user, group=group
+        )
+        # pub_date заполняется автоматически: сдвигаем его запросом UPDATE,
+        # а счетчики тесты затем пересчитывают командой.
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.make_aware(datetime(year, month, day, 12))
+        )
+        post.refresh_from_db()
+        return post
+
+    def test_counters_follow_create_move_and_delete(self):
+        """
+        Проверяем, что счетчики обновляются при создании, переносе в
+        другую группу и удалении поста и совпадают с полным пересчетом.
+        """
+        post = Post.objects.create(
+            text="Пост", author=self.user, group=self.group
+        )
+        year, month = post.pub_date.year, post.pub_date.month
+        self.assertEqual(counters(), {
+            ("site", 0, year, month, 1),
+            ("author", self.user.pk, year, month, 1),
+            ("group", self.group.pk, year, month, 1),
+        })
+        post.group = self.other_group
+        post.save()
+        expected = {
+            ("site", 0, year, month, 1),
+            ("author", self.user.pk, year, month, 1),
+            ("group", self.other_group.pk, year, month, 1),
+        }
+        self.assertEqual(counters(), expected)
+        call_command("rebuild_post_archive", stdout=StringIO())
+        self.assertEqual(counters(), expected)
+        post.delete()
+        self.assertEqual(counters(), set())
+
+    def test_oversized_cursor_is_ignored(self):
+        """
+        Проверяем, что позиция вне диапазона дат или id не приводит к
+        ошибке сервера, а считается некорректной.
+        """
+        post = self.create_post(2021, 5)
+        call_command("rebuild_post_archive", stdout=StringIO())
+        url = reverse("posts:archive_month", args=(2021, 5))
+        for cursor in (
+            "999999999999999999.1",
+            "100000000000000000000000000.1",
+            "-1.1",
+            "1.100000000000000000000",
+        ):
+            with self.subTest(cursor=cursor):
+                self.assertIsNone(parse_keyset_cursor(cursor))
+                response = self.client.get(url, {"after": cursor})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(response.context["posts"], [post])
+
+    @override_settings(NUMBER_OF_POSTS_PER_PAGE=2)
+    def test_month_page_uses_keyset_pagination(self):
+        """
+        Проверяем, что страница месяца выводит только посты месяца и
+        листается по позиции последнего поста.
+        """
+        posts = [self.create_post(2021, 5, day) for day in (1, 2, 3)]
+        self.create_post(2021, 6)
+        call_command("rebuild_post_archive", stdout=StringIO())
+        url = reverse("posts:archive_month", args=(2021, 5))
+        response = self.client.get(url)
+        self.assertEqual(response.context["posts"], posts[:0:-1])
+        next_cursor = response.context["next_cursor"]
+        response = self.client.get(url, {"after": next_cursor})
+        self.assertEqual(response.context["posts"], posts[:1])
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertEqual(
+            [(year, count) for year, count, _ in response.context["years"]],
+            [(2021, 4)],
+        )
+        self.assertEqual(
+            [(month, count) for month, count, _ in response.context["months"]],
+            [(6, 1), (5, 3)],
+        )
+
+    def test_scoped_archives(self):
+        """Проверяем архивы группы и автора и 404 для пустых месяцев."""
+        post = self.create_post(2020, 1, group=self.group)
+        call_command("rebuild_post_archive", stdout=StringIO())
+        for url in (
+            reverse("posts:group_archive_month", args=("test_slug", 2020, 1)),
+            reverse(
+                "posts:profile_archive_month", args=("auth_user", 2020, 1)
+            ),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.context["posts"], [post])
+        for url in (
+            reverse("posts:group_archive_year", args=("other_slug", 2020)),
+            reverse("posts:archive_month", args=(2020, 2)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
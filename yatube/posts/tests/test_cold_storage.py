@@ -0,0 +1,154 @@
+from datetime import datetime
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import (ArchivedComment, ArchivedPost, Comment, Group, Post,
+                      PostArchiveMonth)
+from ..purge import purge_deleted, soft_delete_user
+from ..queries import group_directory
+
+User = get_user_model()
+
+
+@override_settings(NUMBER_OF_POSTS_PER_PAGE=2)
+class ColdStorageTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        cls.old_posts = []
+        for day in (1, 2):
+            post = Post.objects.create(
+                text=f"Старый пост {day}", author=cls.author, group=cls.group
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.make_aware(datetime(2020, 1, day, 12))
+            )
+            cls.old_posts.append(post.pk)
+        Comment.objects.create(
+            post_id=cls.old_posts[0], author=cls.author, text="Старый ответ"
+        )
+        cls.new_posts = [
+            Post.objects.create(
+                text=f"Новый пост {number}", author=cls.author,
+                group=cls.group,
+            ).pk
+            for number in range(2)
+        ]
+        call_command("rebuild_post_archive", stdout=StringIO())
+        cls.counters = set(PostArchiveMonth.objects.values_list(
+            "scope", "scope_id", "year", "month", "post_count"
+        ))
+        call_command(
+            "archive_old_posts", days=30, batch_size=1, pause=0,
+            stdout=StringIO(),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_old_posts_are_moved(self):
+        """
+        Проверяем, что старые посты и их комментарии перенесены в архивные
+        таблицы с прежними id, а счетчики архива не изменились.
+        """
+        self.assertEqual(
+            sorted(Post.all_objects.values_list("pk", flat=True)),
+            self.new_posts,
+        )
+        self.assertEqual(
+            sorted(ArchivedPost.objects.values_list("pk", flat=True)),
+            self.old_posts,
+        )
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old_posts[0]
+        )
+        self.assertEqual(
+            set(PostArchiveMonth.objects.values_list(
+                "scope", "scope_id", "year", "month", "post_count"
+            )),
+            self.counters,
+        )
+        self.assertEqual(group_directory()[0]["post_count"], 4)
+
+    def test_post_detail_reads_archive(self):
+        """
+        Проверяем, что архивный пост открывается по прежнему адресу с
+        комментариями, но без правки и формы комментария.
+        """
+        client = Client()
+        client.force_login(self.author)
+        response = client.get(
+            reverse("posts:post_detail", args=(self.old_posts[0],))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "Старый пост 1")
+        self.assertContains(response, "Старый ответ")
+        self.assertNotContains(
+            response, reverse("posts:post_edit", args=(self.old_posts[0],))
+        )
+        self.assertNotContains(
+            response, reverse("posts:add_comment", args=(self.old_posts[0],))
+        )
+
+    def test_profile_and_archive_pages_continue_into_archive(self):
+        """
+        Проверяем, что профиль и архив за месяц показывают архивные посты
+        после оставшихся в Post.
+        """
+        url = reverse("posts:profile", args=("author",))
+        pages = [
+            [post.pk for post in self.client.get(url, {"page": page})
+             .context["page_obj"]]
+            for page in (1, 2)
+        ]
+        self.assertEqual(
+            pages, [self.new_posts[::-1], self.old_posts[::-1]]
+        )
+        self.assertEqual(
+            self.client.get(url).context["page_obj"].paginator.count, 4
+        )
+        response = self.client.get(
+            reverse("posts:profile_archive_month", args=("author", 2020, 1))
+        )
+        self.assertEqual(
+            [post.pk for post in response.context["posts"]],
+            self.old_posts[::-1],
+        )
+
+    def test_rebuild_counts_archived_posts(self):
+        """
+        Проверяем, что пересчет счетчиков после переноса в архив учитывает
+        и посты из Post, и архивные посты.
+        """
+        call_command("rebuild_post_archive", stdout=StringIO())
+        self.assertEqual(
+            set(PostArchiveMonth.objects.values_list(
+                "scope", "scope_id", "year", "month", "post_count"
+            )),
+            self.counters,
+        )
+
+    def test_purged_archived_posts_leave_counters(self):
+        """
+        Проверяем, что удаление архивных постов вместе с автором вычитает
+        их из счетчиков архива.
+        """
+        soft_delete_user(self.author)
+        purge_deleted(batch_size=1)
+        self.assertFalse(ArchivedPost.all_objects.exists())
+        self.assertEqual(
+            set(PostArchiveMonth.objects.values_list("post_count", flat=True)),
+            {0},
+        )
@@ -0,0 +1,139 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        cls.post = Post.objects.create(
+            text="Пост в ленте", author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_list_posts(self):
+        """Проверяем, что RSS и Atom ленты содержат пост."""
+        urls = {
+            reverse("posts:index_rss"): "application/rss+xml",
+            reverse("posts:index_atom"): "application/atom+xml",
+            reverse("posts:group_rss", args=("test_slug",)):
+                "application/rss+xml",
+            reverse("posts:group_atom", args=("test_slug",)):
+                "application/atom+xml",
+            reverse("posts:profile_rss", args=("auth_user",)):
+                "application/rss+xml",
+            reverse("posts:profile_atom", args=("auth_user",)):
+                "application/atom+xml",
+        }
+        for url, content_type in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(
+                    response["Content-Type"].startswith(content_type)
+                )
+                self.assertContains(response, "Пост в ленте")
+                self.assertTrue(response.has_header("ETag"))
+
+    def test_unknown_group_feed(self):
+        """Проверяем 404 для ленты несуществующей группы."""
+        response = self.client.get(reverse("posts:group_rss", args=("no",)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_and_cached_requests(self):
+        """
+        Проверяем, что повторный запрос с If-None-Match или
+        If-Modified-Since получает 304, тело ленты берется из кеша, а
+        новый пост меняет версию ленты.
+        """
+        url = reverse("posts:group_rss", args=("test_slug",))
+        response = self.client.get(url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        # Запрос группы по slug остается, запросов за постами нет.
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+        Post.objects.create(
+            text="Новый пост в ленте", author=self.user, group=self.group
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Новый пост в ленте")
+
+    def test_group_change_updates_feed(self):
+        """
+        Проверяем, что изменение группы меняет версию ее ленты, и клиент
+        получает новое название вместо ответа 304.
+        """
+        url = reverse("posts:group_rss", args=("test_slug",))
+        etag = self.client.get(url)["ETag"]
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = "Новое название"
+        group.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, "Новое название")
+
+    @override_settings(ALLOWED_HOSTS=["one.example", "two.example"])
+    def test_cached_body_keeps_host_and_scheme(self):
+        """
+        Проверяем, что тело ленты из кеша содержит ссылки на хост и
+        схему текущего запроса.
+        """
+        url = reverse("posts:index_rss")
+        self.client.get(url, HTTP_HOST="one.example")
+        cases = (
+            ({"HTTP_HOST": "two.example"}, "http://two.example/"),
+            ({"HTTP_HOST": "one.example", "secure": True},
+             "https://one.example/"),
+        )
+        for extra, origin in cases:
+            with self.subTest(origin=origin):
+                response = self.client.get(url, **extra)
+                self.assertContains(response, origin)
+                self.assertNotContains(response, "http://one.example/")
+
+    def test_author_rename_updates_feeds(self):
+        """
+        Проверяем, что новое имя автора сразу видно в лентах сайта, автора
+        и групп с его постами.
+        """
+        urls = (
+            reverse("posts:index_rss"),
+            reverse("posts:group_rss", args=("test_slug",)),
+            reverse("posts:profile_rss", args=("auth_user",)),
+        )
+        etags = {url: self.client.get(url)["ETag"] for url in urls}
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = "Новое"
+        user.last_name = "Имя"
+        user.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, "Новое Имя")
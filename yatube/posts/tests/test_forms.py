@@ -11,6 +11,8 @@ from django.db.models.fields.files import ImageFieldFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from core.storage import content_address
+
 from ..models import Comment, Group, Post
 
 User = get_user_model()
@@ -104,7 +106,7 @@ class TestPostsForm(TestCase):
             author=TestPostsForm.user,
             group=form_data["group"],
             pub_date__date=datetime.date.today(),
-            image="posts/small.gif",
+            image=content_address("posts/small.gif", uploaded_image),
         )
         self.assertIsInstance(post, Post)
         self.assertIsInstance(post.image, ImageFieldFile)
@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..queries import group_directory
+
+User = get_user_model()
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first_author = User.objects.create_user(username="first_author")
+        cls.last_author = User.objects.create_user(username="last_author")
+        cls.group = Group.objects.create(
+            title="Активная группа", slug="active", description="Описание"
+        )
+        cls.empty_group = Group.objects.create(
+            title="Пустая группа", slug="empty", description="Описание"
+        )
+        Post.objects.create(
+            text="Первый пост", author=cls.first_author, group=cls.group
+        )
+        cls.last_post = Post.objects.create(
+            text="Последний пост", author=cls.last_author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_stats_are_computed_in_one_query(self):
+        """
+        Проверяем статистику групп и то, что она считается одним запросом
+        и затем берется из кеша.
+        """
+        with self.assertNumQueries(1):
+            groups = group_directory()
+        with self.assertNumQueries(0):
+            self.assertEqual(group_directory(), groups)
+        active, empty = groups
+        self.assertEqual(active["slug"], self.group.slug)
+        self.assertEqual(active["post_count"], 2)
+        self.assertEqual(active["last_post_date"], self.last_post.pub_date)
+        self.assertEqual(active["last_poster"], self.last_author.username)
+        self.assertEqual(empty["post_count"], 0)
+        self.assertIsNone(empty["last_poster"])
+
+    def test_cache_is_reset_on_post_create_and_delete(self):
+        """Проверяем, что кеш сбрасывается при создании и удалении поста."""
+        group_directory()
+        post = Post.objects.create(
+            text="Новый пост", author=self.first_author, group=self.group
+        )
+        self.assertEqual(group_directory()[0]["post_count"], 3)
+        self.assertEqual(group_directory()[0]["last_poster"], "first_author")
+        post.delete()
+        self.assertEqual(group_directory()[0]["post_count"], 2)
+
+    def test_group_index_page(self):
+        """Проверяем, что страница групп выводит ссылки на группы."""
+        response = self.client.get(reverse("posts:group_index"))
+        self.assertTemplateUsed(response, "posts/group_index.html")
+        self.assertContains(
+            response, reverse("posts:group_list", args=(self.group.slug,))
+        )
+        self.assertContains(
+            response,
+            reverse("posts:profile", args=(self.last_author.username,)),
+        )
@@ -0,0 +1,73 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from ..identity import IdentityMap
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class IdentityMapTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test_slug",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            text="Тестовый пост",
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_object_is_loaded_once(self):
+        """
+        Проверяем, что повторный запрос объекта по pk или естественному
+        ключу не обращается к БД.
+        """
+        identity_map = IdentityMap()
+        with self.assertNumQueries(1):
+            group = identity_map.get(Group, slug=IdentityMapTest.group.slug)
+            self.assertIs(
+                identity_map.get(Group, pk=IdentityMapTest.group.pk), group
+            )
+            self.assertIs(
+                identity_map.get(Group, slug=IdentityMapTest.group.slug),
+                group
+            )
+
+    def test_request_user_is_reused(self):
+        """
+        Проверяем, что пользователь запроса и автор поста - один и тот же
+        объект без дополнительных запросов.
+        """
+        identity_map = IdentityMap(IdentityMapTest.user)
+        with self.assertNumQueries(1):
+            post = identity_map.get(Post, pk=IdentityMapTest.post.pk)
+            self.assertIs(post.author, IdentityMapTest.user)
+            self.assertIs(
+                identity_map.get(
+                    User, username=IdentityMapTest.user.username
+                ),
+                IdentityMapTest.user
+            )
+            self.assertIs(
+                identity_map.get(Group, pk=IdentityMapTest.group.pk),
+                post.group
+            )
+
+    def test_missing_object_raises_404(self):
+        """Проверяем, что отсутствующий объект приводит к Http404."""
+        identity_map = IdentityMap()
+        for lookup in ({"pk": 0}, {"pk": "not_a_number"}):
+            with self.subTest(lookup=lookup):
+                with self.assertRaises(Http404):
+                    identity_map.get_or_404(Post, **lookup)
@@ -1,6 +1,9 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from ..models import Comment, Follow, Group, Post
 
@@ -159,3 +162,57 @@ class ModelsTest(TestCase):
             Follow.objects.create(
                 user=ModelsTest.user, author=ModelsTest.user
             )
+
+
+@override_settings(POST_EXCERPT_LENGTH=10)
+class PostExcerptTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="user")
+
+    def test_excerpt_is_updated_on_save(self):
+        """
+        Проверяем, что анонс поста обрезается по границе слова и
+        пересчитывается при изменении текста.
+        """
+        post = Post.objects.create(
+            author=PostExcerptTest.user, text="Длинный текст поста"
+        )
+        self.assertEqual(post.excerpt, "Длинный")
+        self.assertTrue(post.excerpt_truncated)
+        post.text = "Короткий"
+        post.save(update_fields=("text",))
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Короткий")
+        self.assertFalse(post.excerpt_truncated)
+
+    def test_excerpt_is_filled_on_bulk_create(self):
+        """Проверяем, что анонс заполняется при массовом создании."""
+        Post.objects.bulk_create([
+            Post(author=PostExcerptTest.user, text="Длинный текст поста")
+        ])
+        self.assertEqual(Post.objects.get().excerpt, "Длинный")
+
+    def test_backfill_command(self):
+        """Проверяем, что команда заполняет анонсы существующих постов."""
+        post = Post.objects.create(
+            author=PostExcerptTest.user, text="Длинный текст поста"
+        )
+        Post.objects.update(excerpt="", excerpt_truncated=False)
+        call_command("backfill_post_excerpts", batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Длинный")
+        self.assertTrue(post.excerpt_truncated)
+
+    def test_backfill_includes_inactive_authors(self):
+        """
+        Проверяем, что команда обновляет анонсы и у постов неактивных
+        авторов.
+        """
+        author = User.objects.create_user(username="inactive", is_active=False)
+        post = Post.objects.create(author=author, text="Длинный текст поста")
+        Post.all_objects.update(excerpt="", excerpt_truncated=False)
+        call_command("backfill_post_excerpts", batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, "Длинный")
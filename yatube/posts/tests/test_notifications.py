@@ -0,0 +1,115 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..cold_storage import archive_old_posts
+from ..models import Notification, Post
+from ..notifications import get_unread_count, notify
+from ..purge import purge_deleted, soft_delete_user
+
+User = get_user_model()
+
+
+class NotificationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.post = Post.objects.create(text="Пост автора", author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_comment_and_follow_notify_author(self):
+        """
+        Проверяем, что комментарий и подписка создают уведомления автору,
+        а собственный комментарий и повторная подписка - нет.
+        """
+        self.reader_client.post(
+            reverse("posts:add_comment", args=(self.post.pk,)),
+            data={"text": "Комментарий"},
+        )
+        self.author_client.post(
+            reverse("posts:add_comment", args=(self.post.pk,)),
+            data={"text": "Ответ автора"},
+        )
+        follow_url = reverse("posts:profile_follow", args=("author",))
+        self.reader_client.get(follow_url)
+        self.reader_client.get(follow_url)
+        kinds = Notification.objects.filter(
+            recipient=self.author, actor=self.reader
+        ).values_list("kind", flat=True)
+        self.assertEqual(
+            sorted(kinds), [Notification.COMMENT, Notification.FOLLOW]
+        )
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_unread_count_is_cached(self):
+        """
+        Проверяем, что счетчик в шапке читается из кеша без запросов,
+        растет с новым уведомлением и обнуляется в списке уведомлений.
+        """
+        url = reverse("about:author")
+        response = self.author_client.get(url)
+        self.assertNotContains(response, 'class="badge')
+        self.assertEqual(get_unread_count(self.author.pk), 0)
+        with self.assertNumQueries(0):
+            get_unread_count(self.author.pk)
+
+        self.reader_client.get(
+            reverse("posts:profile_follow", args=("author",))
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.author.pk), 1)
+        response = self.author_client.get(url)
+        self.assertContains(response, '<span class="badge bg-danger">1</span>')
+
+        response = self.author_client.get(reverse("posts:notifications"))
+        self.assertContains(response, "подписался(ась) на вас")
+        self.assertContains(response, "list-group-item-primary")
+        self.assertEqual(get_unread_count(self.author.pk), 0)
+        self.assertFalse(
+            Notification.objects.filter(
+                recipient=self.author, is_read=False
+            ).exists()
+        )
+
+    def test_unread_count_is_reset_by_purge_and_archive(self):
+        """
+        Проверяем, что удаление уведомлений очисткой и переносом в архив
+        сбрасывает счетчик непрочитанных получателя.
+        """
+        reader_post = Post.objects.create(text="Пост читателя",
+                                          author=self.reader)
+        notify(self.author, self.reader, Notification.FOLLOW)
+        notify(self.reader, self.author, Notification.COMMENT,
+               post=reader_post)
+        self.assertEqual(get_unread_count(self.author.pk), 1)
+        self.assertEqual(get_unread_count(self.reader.pk), 1)
+
+        archive_old_posts(timezone.now(), batch_size=10)
+        self.assertEqual(get_unread_count(self.reader.pk), 0)
+        soft_delete_user(User.objects.get(pk=self.reader.pk))
+        purge_deleted(batch_size=10)
+        self.assertEqual(get_unread_count(self.author.pk), 0)
+
+    def test_unread_count_skips_deleted_actors(self):
+        """
+        Проверяем, что счетчик, как и список, не учитывает уведомления
+        от удаленных пользователей.
+        """
+        notify(self.author, self.reader, Notification.FOLLOW)
+        self.assertEqual(get_unread_count(self.author.pk), 1)
+        soft_delete_user(User.objects.get(pk=self.reader.pk))
+        self.assertEqual(get_unread_count(self.author.pk), 0)
+        cache.clear()
+        self.assertEqual(get_unread_count(self.author.pk), 0)
+        response = self.author_client.get(reverse("posts:notifications"))
+        self.assertEqual(len(response.context["page_obj"]), 0)
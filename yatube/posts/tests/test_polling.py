@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Follow, Group, Post
+from ..utils import make_keyset_cursor
+
+User = get_user_model()
+
+
+class NewPostsPollingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        cls.old_post = Post.objects.create(
+            text="Старый пост", author=cls.author, group=cls.group
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.since = make_keyset_cursor(self.old_post)
+
+    def poll(self, url, since=None, client=None):
+        client = client or self.client
+        response = client.get(url, {"since": since or self.since})
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        return response.json()
+
+    def test_new_posts_in_every_feed(self):
+        """
+        Проверяем, что каждая лента возвращает число и id новых постов и
+        позицию самого нового из них.
+        """
+        new_post = Post.objects.create(
+            text="Новый пост", author=self.author, group=self.group
+        )
+        urls = (
+            reverse("posts:new_posts"),
+            reverse("posts:group_new_posts", args=("test_slug",)),
+            reverse("posts:profile_new_posts", args=("author",)),
+            reverse("posts:follow_new_posts"),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.poll(url, client=self.reader_client),
+                    {
+                        "count": 1,
+                        "ids": [new_post.pk],
+                        "cursor": make_keyset_cursor(new_post),
+                    },
+                )
+
+    def test_poll_without_new_posts_uses_cache(self):
+        """
+        Проверяем, что опрос без новых постов после первого обращения
+        обходится без запросов за постами, а новый пост сразу виден в
+        ответе.
+        """
+        url = reverse("posts:group_new_posts", args=("test_slug",))
+        self.assertEqual(self.poll(url)["count"], 0)
+        # Остается только запрос группы по slug.
+        with self.assertNumQueries(1):
+            self.assertEqual(self.poll(url)["count"], 0)
+
+        new_post = Post.objects.create(
+            text="Новый пост", author=self.author, group=self.group
+        )
+        self.assertEqual(self.poll(url)["ids"], [new_post.pk])
+        with self.assertNumQueries(1):
+            self.poll(url, since=make_keyset_cursor(new_post))
+
+        Post.objects.filter(pk=new_post.pk).delete()
+        self.assertEqual(self.poll(url)["count"], 0)
+
+    def test_unknown_and_deleted_scopes(self):
+        """
+        Проверяем, что опрос ленты неизвестной или удаленной группы и
+        неизвестного или удаленного автора возвращает 404.
+        """
+        hidden_group = Group.objects.create(
+            title="Скрытая", slug="hidden", deleted_at=timezone.now()
+        )
+        User.objects.create_user(username="gone", is_active=False)
+        urls = (
+            reverse("posts:group_new_posts", args=("missing",)),
+            reverse("posts:group_new_posts", args=(hidden_group.slug,)),
+            reverse("posts:profile_new_posts", args=("missing",)),
+            reverse("posts:profile_new_posts", args=("gone",)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, {"since": self.since})
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_bad_cursor(self):
+        """Проверяем, что без корректной позиции возвращается 400."""
+        urls = (
+            reverse("posts:new_posts"),
+            reverse("posts:group_new_posts", args=("test_slug",)),
+            reverse("posts:profile_new_posts", args=("author",)),
+            reverse("posts:follow_new_posts"),
+        )
+        cursors = (
+            "", "abc", "1.2.3", "-1.1",
+            "999999999999999999.1", "100000000000000000000000000.1",
+        )
+        for url in urls:
+            for since in cursors:
+                with self.subTest(url=url, since=since):
+                    response = self.reader_client.get(url, {"since": since})
+                    self.assertEqual(
+                        response.status_code, HTTPStatus.BAD_REQUEST
+                    )
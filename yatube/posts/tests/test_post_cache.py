@@ -0,0 +1,132 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post
+from ..purge import detach_in_batches, soft_delete_post, soft_delete_user
+from ..queries import get_cached_post
+
+User = get_user_model()
+
+
+class PostCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text="Тестовый пост", author=self.user, group=self.group
+        )
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_post_is_read_through_cache(self):
+        """
+        Проверяем, что пост с автором и группой читается из базы один
+        раз, а правка через форму сразу видна на странице поста.
+        """
+        with self.assertNumQueries(1):
+            post = get_cached_post(self.post.pk)
+        with self.assertNumQueries(0):
+            post = get_cached_post(self.post.pk)
+            self.assertEqual(post.author.username, "auth_user")
+            self.assertEqual(post.group.slug, "test_slug")
+
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(self.post.pk,)),
+            data={"text": "Исправленный пост", "group": self.group.pk},
+        )
+        response = self.client.get(
+            reverse("posts:post_detail", args=(self.post.pk,))
+        )
+        self.assertContains(response, "Исправленный пост")
+
+    def test_missing_post_is_cached(self):
+        """
+        Проверяем, что отсутствие поста кешируется, а новый пост с этим
+        id виден сразу.
+        """
+        pk = self.post.pk + 100
+        for queries in (1, 0):
+            with self.subTest(queries=queries):
+                with self.assertNumQueries(queries):
+                    with self.assertRaises(Post.DoesNotExist):
+                        get_cached_post(pk)
+        Post.objects.create(pk=pk, text="Новый пост", author=self.user)
+        self.assertEqual(get_cached_post(pk).text, "Новый пост")
+
+    def test_hidden_post_is_not_served_from_cache(self):
+        """
+        Проверяем, что скрытый пост и посты удаленного пользователя сразу
+        пропадают, хотя были в кеше.
+        """
+        other = Post.objects.create(text="Второй пост", author=self.user)
+        for post in (self.post, other):
+            get_cached_post(post.pk)
+        soft_delete_post(self.post)
+        url = reverse("posts:post_detail", args=(self.post.pk,))
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+        user = User.objects.get(pk=self.user.pk)
+        soft_delete_user(user)
+        url = reverse("posts:post_detail", args=(other.pk,))
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.NOT_FOUND
+        )
+
+    def test_cached_post_has_no_credentials(self):
+        """
+        Проверяем, что в кеш попадают только нужные странице поля
+        автора, без хеша пароля.
+        """
+        author = get_cached_post(self.post.pk).author
+        self.assertEqual(author.username, "auth_user")
+        self.assertIn("password", author.get_deferred_fields())
+        self.assertIn("email", author.get_deferred_fields())
+
+    def test_edit_form_is_bound_to_fresh_row(self):
+        """
+        Проверяем, что правка поста не возвращает устаревшие поля из
+        кеша: пост, скрытый в обход сигналов, остается скрытым.
+        """
+        get_cached_post(self.post.pk)
+        Post.all_objects.filter(pk=self.post.pk).update(
+            deleted_at=timezone.now()
+        )
+        self.authorized_client.post(
+            reverse("posts:post_edit", args=(self.post.pk,)),
+            data={"text": "Исправленный пост"},
+        )
+        post = Post.all_objects.get(pk=self.post.pk)
+        self.assertEqual(post.text, "Тестовый пост")
+        self.assertIsNotNone(post.deleted_at)
+
+    def test_renames_and_detach_reset_cache(self):
+        """
+        Проверяем, что переименование автора и группы и отвязка постов
+        от группы сбрасывают кеш поста.
+        """
+        get_cached_post(self.post.pk)
+        self.user.first_name = "Новое имя"
+        self.user.save()
+        self.assertEqual(
+            get_cached_post(self.post.pk).author.first_name, "Новое имя"
+        )
+        self.group.title = "Новое название"
+        self.group.save()
+        self.assertEqual(
+            get_cached_post(self.post.pk).group.title, "Новое название"
+        )
+        detach_in_batches(Post.all_objects.filter(group=self.group), 10)
+        self.assertIsNone(get_cached_post(self.post.pk).group)
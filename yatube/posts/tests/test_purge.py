@@ -0,0 +1,201 @@
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..archive import archive_months
+from ..models import (Comment, Follow, Group, Post, PostArchiveMonth,
+                      UserDeletion)
+from ..purge import (purge_deleted, soft_delete_group, soft_delete_post,
+                     soft_delete_user)
+
+User = get_user_model()
+
+
+class SoftDeleteTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.reader = User.objects.create_user(username="reader")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def create_posts(self, count, author=None, group=None):
+        return [
+            Post.objects.create(
+                text=f"Пост {number}",
+                author=author or self.author,
+                group=group or self.group,
+            )
+            for number in range(count)
+        ]
+
+    def site_post_count(self):
+        return sum(
+            archive_months(PostArchiveMonth.SITE)
+            .values_list("post_count", flat=True)
+        )
+
+    def test_deleted_post_is_hidden_and_purged(self):
+        """
+        Проверяем, что скрытый пост сразу пропадает со страниц и из
+        счетчиков архива, а очистка удаляет его вместе с комментариями.
+        """
+        post, other = self.create_posts(2)
+        Comment.objects.create(post=post, author=self.reader, text="Текст")
+        soft_delete_post(post)
+        response = self.client.get(reverse("posts:index"))
+        self.assertNotIn(post, response.context["page_obj"])
+        self.assertIn(other, response.context["page_obj"])
+        response = self.client.get(
+            reverse("posts:post_detail", args=(post.pk,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertEqual(self.site_post_count(), 1)
+
+        purged = purge_deleted(batch_size=1)
+        self.assertEqual((purged["posts"], purged["comments"]), (1, 1))
+        self.assertFalse(Post.all_objects.filter(pk=post.pk).exists())
+        self.assertEqual(self.site_post_count(), 1)
+
+    def test_deleted_group_is_detached_in_batches(self):
+        """
+        Проверяем, что скрытая группа сразу недоступна, а очистка
+        пачками отвязывает от нее посты и удаляет ее.
+        """
+        group = Group.objects.create(title="Большая", slug="big")
+        posts = self.create_posts(3, group=group)
+        soft_delete_group(group)
+        response = self.client.get(reverse("posts:group_list", args=("big",)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        group_url = reverse("posts:group_list", args=("big",))
+        for url in (
+            reverse("posts:index"),
+            reverse("posts:post_detail", args=(posts[0].pk,)),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, posts[0].text)
+                self.assertNotContains(response, group_url)
+
+        purged = purge_deleted(batch_size=2)
+        self.assertEqual(
+            (purged["detached posts"], purged["groups"]), (3, 1)
+        )
+        self.assertFalse(Group.all_objects.filter(pk=group.pk).exists())
+        self.assertEqual(
+            Post.objects.filter(pk__in=[post.pk for post in posts],
+                                group=None).count(),
+            3,
+        )
+
+    def test_deleted_user_is_hidden_and_purged(self):
+        """
+        Проверяем, что удаленный пользователь сразу пропадает вместе с
+        постами и комментариями, а очистка удаляет его данные.
+        """
+        user = User.objects.create_user(username="prolific")
+        posts = self.create_posts(3, author=user)
+        Comment.objects.create(post=posts[0], author=self.reader, text="Ответ")
+        own_post, = self.create_posts(1)
+        Comment.objects.create(post=own_post, author=user, text="Коммент")
+        Follow.objects.create(user=self.reader, author=user)
+
+        soft_delete_user(user)
+        response = self.client.get(reverse("posts:profile", args=(user,)))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.client.get(reverse("posts:index"))
+        self.assertEqual(list(response.context["page_obj"]), [own_post])
+        response = self.client.get(
+            reverse("posts:post_detail", args=(own_post.pk,))
+        )
+        self.assertEqual(len(response.context["comments"]), 0)
+
+        out = StringIO()
+        call_command("purge_deleted", batch_size=2, pause=0, stdout=out)
+        self.assertIn("users: 1", out.getvalue())
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertFalse(Post.all_objects.filter(author_id=user.pk).exists())
+        self.assertEqual(Comment.objects.count(), 0)
+        self.assertFalse(UserDeletion.objects.exists())
+
+    def test_purge_queries_do_not_grow_with_batch(self):
+        """
+        Проверяем, что счетчики архива и ленты обновляются один раз на
+        пачку: число запросов очистки не зависит от числа постов.
+        """
+        queries = []
+        for username, count in (("first", 2), ("second", 6)):
+            user = User.objects.create_user(username=username)
+            self.create_posts(count, author=user)
+            soft_delete_user(user)
+            with CaptureQueriesContext(connection) as context:
+                purge_deleted(batch_size=10)
+            queries.append(len(context))
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(self.site_post_count(), 0)
+
+    def test_counters_survive_rebuild_between_delete_and_purge(self):
+        """
+        Проверяем, что пересчет счетчиков между удалением пользователя и
+        очисткой не приводит к повторному вычитанию его постов.
+        """
+        user = User.objects.create_user(username="leaving")
+        self.create_posts(3, author=user)
+        self.create_posts(2)
+        soft_delete_user(user)
+        call_command("rebuild_post_archive", stdout=StringIO())
+        purge_deleted(batch_size=2)
+        self.assertEqual(self.site_post_count(), Post.objects.count())
+        self.assertEqual(self.site_post_count(), 2)
+
+    def test_group_move_of_hidden_post_moves_counters(self):
+        """
+        Проверяем, что перенос в другую группу поста неактивного автора
+        переносит его и в счетчиках групп.
+        """
+        user = User.objects.create_user(username="hidden")
+        post, = self.create_posts(1, author=user)
+        soft_delete_user(user)
+        other = Group.objects.create(title="Другая", slug="other")
+        post = Post.all_objects.get(pk=post.pk)
+        post.group = other
+        post.save()
+        counts = dict(
+            PostArchiveMonth.objects.filter(scope=PostArchiveMonth.GROUP)
+            .values_list("scope_id", "post_count")
+        )
+        self.assertEqual(counts, {self.group.pk: 0, other.pk: 1})
+
+    def test_admin_delete_is_soft(self):
+        """Проверяем, что удаление в админке только скрывает объекты."""
+        admin = User.objects.create_superuser(
+            "admin", "admin@example.com", "password"
+        )
+        client = Client()
+        client.force_login(admin)
+        post, = self.create_posts(1)
+        user = User.objects.create_user(username="to_delete")
+        for url, model, pk in (
+            (f"/admin/posts/post/{post.pk}/delete/", Post, post.pk),
+            (f"/admin/auth/user/{user.pk}/delete/", User, user.pk),
+        ):
+            with self.subTest(url=url):
+                response = client.post(url, {"post": "yes"})
+                self.assertEqual(response.status_code, HTTPStatus.FOUND)
+                self.assertTrue(
+                    model._base_manager.filter(pk=pk).exists()
+                )
+        self.assertIsNotNone(Post.all_objects.get(pk=post.pk).deleted_at)
+        self.assertTrue(UserDeletion.objects.filter(user=user).exists())
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from .. import queries
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="follower")
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test_slug",
+            description="Тестовое описание",
+        )
+        Post.objects.bulk_create([
+            Post(text=f"Пост {i}", author=cls.author, group=cls.group)
+            for i in range(5)
+        ])
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def test_feeds_render_cards_in_one_query(self):
+        """
+        Проверяем, что все ленты загружают автора и группу одним запросом
+        и не загружают лишние колонки автора.
+        """
+        feeds = {
+            "index": queries.index_feed(),
+            "group": queries.group_feed(FeedQueriesTest.group),
+            "profile": queries.profile_feed(FeedQueriesTest.author),
+            "follow": queries.follow_feed(FeedQueriesTest.user),
+        }
+        for name, feed in feeds.items():
+            with self.subTest(feed=name):
+                with self.assertNumQueries(1):
+                    posts = list(feed)
+                    for post in posts:
+                        post.author.get_full_name()
+                        post.author.username
+                        post.group.slug
+                self.assertEqual(len(posts), 5)
+                self.assertIn(
+                    "password", posts[0].author.get_deferred_fields()
+                )
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from ..models import Group, Post
+from ..sitemaps import generate_sitemaps
+
+User = get_user_model()
+
+SITEMAP_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    SITEMAP_ROOT=SITEMAP_ROOT,
+    SITEMAP_BASE_URL="https://example.com",
+    SITEMAP_SHARD_SIZE=2,
+)
+class SitemapTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        # Шарды по два поста: в первом посты 1 и 2, во втором - пост 3.
+        cls.posts = [
+            Post.objects.create(
+                pk=pk, text=f"Пост {pk}", author=cls.user, group=cls.group
+            )
+            for pk in (1, 2, 3)
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        shutil.rmtree(SITEMAP_ROOT, ignore_errors=True)
+
+    def read(self, name):
+        with open(os.path.join(SITEMAP_ROOT, name), encoding="utf-8") as f:
+            return f.read()
+
+    def test_index_and_shards(self):
+        """
+        Проверяем, что индекс перечисляет шарды, а шарды содержат адреса
+        постов, группы и профиля.
+        """
+        call_command("generate_sitemaps", stdout=StringIO())
+        index = self.read("sitemap.xml")
+        names = (
+            "sitemap-posts-1.xml", "sitemap-posts-2.xml",
+            "sitemap-groups-1.xml", "sitemap-profiles-1.xml",
+        )
+        for name in names:
+            self.assertIn(f"<loc>https://example.com/{name}</loc>", index)
+        shards = "".join(self.read(name) for name in names)
+        self.assertEqual(shards.count("<url>"), 5)
+        for post in self.posts:
+            self.assertIn(
+                f"<loc>https://example.com/posts/{post.pk}/</loc>", shards
+            )
+        self.assertIn("https://example.com/group/test_slug/", shards)
+        self.assertIn("https://example.com/profile/auth_user/", shards)
+
+    def test_only_changed_shards_are_rewritten(self):
+        """
+        Проверяем, что повторный запуск без изменений ничего не пишет, а
+        после удаления поста переписывается только его шард.
+        """
+        self.assertEqual(generate_sitemaps(), (4, 0))
+        self.assertEqual(generate_sitemaps(), (0, 4))
+
+        untouched = os.path.join(SITEMAP_ROOT, "sitemap-posts-2.xml")
+        mtime = os.stat(untouched).st_mtime_ns
+        Post.objects.filter(pk=2).delete()
+        self.assertEqual(generate_sitemaps(), (1, 3))
+        self.assertEqual(os.stat(untouched).st_mtime_ns, mtime)
+        self.assertNotIn("/posts/2/", self.read("sitemap-posts-1.xml"))
+
+        Post.objects.filter(pk=3).delete()
+        self.assertEqual(generate_sitemaps(), (0, 3))
+        self.assertFalse(os.path.exists(untouched))
+        self.assertNotIn("sitemap-posts-2.xml", self.read("sitemap.xml"))
+
+    def test_sitemap_is_served_from_root(self):
+        """Проверяем, что индекс и шарды отдаются из корня сайта."""
+        generate_sitemaps()
+        for url in ("/sitemap.xml", "/sitemap-groups-1.xml"):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(response["Content-Type"], "application/xml")
+                self.assertTrue(response.has_header("ETag"))
+        response = self.client.get("/sitemap-manifest.json")
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Follow, FollowSuggestion
+from ..suggestions import sparse
+
+User = get_user_model()
+
+
+class FollowSuggestionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if sparse is None:
+            return
+        cls.users = {
+            name: User.objects.create_user(username=name)
+            for name in ("reader", "author", "other_author", "fan", "critic")
+        }
+        follows = (
+            ("reader", "author"),
+            ("fan", "author"),
+            ("fan", "other_author"),
+            ("critic", "author"),
+            ("critic", "other_author"),
+            ("critic", "fan"),
+        )
+        for user, author in follows:
+            Follow.objects.create(
+                user=cls.users[user], author=cls.users[author]
+            )
+
+    def setUp(self):
+        if sparse is None:
+            self.skipTest("numpy and scipy are not installed")
+
+    def get_suggestions(self):
+        return list(FollowSuggestion.objects.values_list(
+            "user__username", "suggested__username", "rank", "score"
+        ))
+
+    def test_co_followed_authors_are_suggested(self):
+        """
+        Проверяем, что пользователю предлагаются авторы, на которых
+        подписаны пользователи с общими подписками, кроме тех, на кого он
+        уже подписан, и что результат не зависит от размера пачки.
+        """
+        expected = [
+            ("reader", "other_author", 1, 2.0),
+            ("reader", "fan", 2, 1.0),
+        ]
+        for chunk_size in (1, 1000):
+            with self.subTest(chunk_size=chunk_size):
+                call_command(
+                    "compute_follow_suggestions",
+                    chunk_size=chunk_size,
+                    stdout=StringIO(),
+                )
+                self.assertEqual(self.get_suggestions(), expected)
+
+    def test_suggestions_on_profile_page(self):
+        """
+        Проверяем, что рекомендации выводятся на странице профиля и
+        пропадают после подписки.
+        """
+        call_command("compute_follow_suggestions", stdout=StringIO())
+        reader = self.users["reader"]
+        self.client.force_login(reader)
+        url = reverse("posts:profile", args=(reader.username,))
+        response = self.client.get(url)
+        self.assertEqual(
+            [suggestion.suggested for suggestion in response.context[
+                "suggestions"
+            ]],
+            [self.users["other_author"], self.users["fan"]],
+        )
+        Follow.objects.create(user=reader, author=self.users["other_author"])
+        response = self.client.get(reverse("posts:follow_index"))
+        self.assertEqual(
+            [suggestion.suggested for suggestion in response.context[
+                "suggestions"
+            ]],
+            [self.users["fan"]],
+        )
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from ..models import Post
+from ..thumbnails import get_responsive_thumbnails, prefetch_thumbnails
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PrefetchThumbnailsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Копии, оставшиеся в кеше sorl после других тестов, не попадут в БД.
+        cache.clear()
+        cls.user = User.objects.create_user(username="auth_user")
+        for i in range(3):
+            Post.objects.create(
+                text=f"Пост {i}",
+                author=cls.user,
+                image=SimpleUploadedFile(
+                    f"file_{i}.gif",
+                    b"GIF89a\x01\x00\x01\x00\x00\x00\x00!\xf9\x04\x01\n\x00"
+                    b"\x01\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02L"
+                    + bytes((i,)) + b"\x00;",
+                    content_type="image/gif",
+                ),
+            )
+        Post.objects.create(text="Пост без картинки", author=cls.user)
+        cls.expected_names = {
+            post.pk: [
+                thumbnail.name
+                for thumbnail in get_responsive_thumbnails(post.image)
+            ]
+            for post in Post.objects.exclude(image="")
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_thumbnails_are_loaded_in_one_query(self):
+        """
+        Проверяем, что сведения о копиях всех постов страницы загружаются
+        одним запросом к БД при пустом кеше и без запросов при заполненном.
+        """
+        cache.clear()
+        for expected_queries in (1, 0):
+            with self.subTest(expected_queries=expected_queries):
+                posts = list(Post.objects.all())
+                with self.assertNumQueries(expected_queries):
+                    prefetch_thumbnails(posts)
+                for post in posts:
+                    if not post.image:
+                        self.assertFalse(hasattr(post, "thumbnails"))
+                        continue
+                    self.assertEqual(
+                        [thumbnail.name for thumbnail in post.thumbnails],
+                        self.expected_names[post.pk]
+                    )
+                    self.assertEqual(post.thumbnails[-1].width, 960)
+
+    def test_missing_thumbnails_are_not_attached(self):
+        """
+        Проверяем, что для постов без созданных копий атрибут не задается.
+        """
+        post = Post.objects.create(
+            text="Новый пост",
+            author=PrefetchThumbnailsTest.user,
+            image=SimpleUploadedFile(
+                "new.gif", b"GIF89a-new", content_type="image/gif"
+            ),
+        )
+        prefetch_thumbnails([post])
+        self.assertFalse(hasattr(post, "thumbnails"))
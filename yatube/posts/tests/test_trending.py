@@ -0,0 +1,68 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Post, TrendingPost
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="auth_user")
+        cls.quiet_post = Post.objects.create(
+            text="Пост без комментариев", author=cls.user
+        )
+        cls.old_post = Post.objects.create(
+            text="Пост с давним обсуждением", author=cls.user
+        )
+        cls.hot_post = Post.objects.create(
+            text="Пост со свежим обсуждением", author=cls.user
+        )
+        cls.stale_post = Post.objects.create(
+            text="Пост с комментарием вне окна", author=cls.user
+        )
+        now = timezone.now()
+        comments = (
+            (cls.old_post, 20),
+            (cls.old_post, 20),
+            (cls.old_post, 20),
+            (cls.hot_post, 0),
+            (cls.hot_post, 1),
+            (cls.stale_post, 24 * 30),
+        )
+        for post, hours_ago in comments:
+            comment = Comment.objects.create(
+                post=post, author=cls.user, text="Комментарий"
+            )
+            Comment.objects.filter(pk=comment.pk).update(
+                created=now - timedelta(hours=hours_ago)
+            )
+
+    def test_posts_are_ranked_by_decayed_comment_count(self):
+        """
+        Проверяем, что свежие комментарии весят больше давних, а посты
+        без комментариев в окне не попадают в рейтинг.
+        """
+        call_command("compute_trending", stdout=StringIO())
+        self.assertEqual(
+            list(TrendingPost.objects.values_list("post", "rank")),
+            [(self.hot_post.pk, 1), (self.old_post.pk, 2)],
+        )
+
+    def test_popular_page_shows_ranked_posts(self):
+        """Проверяем, что лента "Популярное" выводит посты по рейтингу."""
+        call_command("compute_trending", stdout=StringIO())
+        response = self.client.get(reverse("posts:popular"))
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            [self.hot_post.pk, self.old_post.pk],
+        )
+        self.assertContains(response, reverse("posts:popular"))
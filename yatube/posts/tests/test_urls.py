@@ -37,6 +37,8 @@ class PostsURLTests(TestCase):
 
         cls.url_template_names_guest_access = {
             "/": "posts/index.html",
+            "/popular/": "posts/popular.html",
+            "/group/": "posts/group_index.html",
             f"/group/{slug}/": "posts/group_list.html",
             f"/profile/{username}/": "posts/profile.html",
             f"/posts/{post_id}/": "posts/post_detail.html",
@@ -44,6 +46,7 @@ class PostsURLTests(TestCase):
         cls.url_template_names_auth_access = {
             "/create/": "posts/create_post.html",
             "/follow/": "posts/follow.html",
+            "/notifications/": "posts/notifications.html",
         }
         cls.url_template_names_auth_author_access = {
             f"/posts/{post_id}/edit/": "posts/create_post.html",
@@ -643,6 +643,19 @@ class ImageCreationTest(TestCase):
             post_obj.image.name, ImageCreationTest.post.image.name
         )
 
+    def test_image_has_responsive_variants(self):
+        """
+        Проверяем, что картинка в карточке поста выводится с набором
+        уменьшенных копий, размерами и отложенной загрузкой.
+        """
+        response = self.guest_client.get(reverse("posts:index"))
+        content = response.content.decode()
+        for width in settings.POST_IMAGE_WIDTHS:
+            with self.subTest(width=width):
+                self.assertIn(f" {width}w", content)
+        self.assertIn('loading="lazy"', content)
+        self.assertIn('width="960" height="339"', content)
+
 
 class CommentCreationTest(TestCase):
     @classmethod
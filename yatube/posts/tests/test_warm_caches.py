@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from sorl.thumbnail.models import KVStore
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b"\x47\x49\x46\x38\x39\x61\x01\x00"
+    b"\x01\x00\x00\x00\x00\x21\xf9\x04"
+    b"\x01\x0a\x00\x01\x00\x2c\x00\x00"
+    b"\x00\x00\x01\x00\x01\x00\x00\x02"
+    b"\x02\x4c\x01\x00\x3b"
+)
+
+
+# Потоки команды работают с БД через свои соединения, поэтому данные
+# должны быть зафиксированы: используем TransactionTestCase.
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class WarmCachesCommandTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="auth_user")
+        self.group = Group.objects.create(
+            title="Тестовая группа", slug="test_slug", description="Описание"
+        )
+        Post.objects.create(
+            text="Пост с картинкой",
+            author=self.user,
+            group=self.group,
+            image=SimpleUploadedFile(
+                "small.gif", SMALL_GIF, content_type="image/gif"
+            ),
+        )
+
+    def test_index_page_is_cached(self):
+        """
+        Проверяем, что после прогрева главная страница отдается из кеша
+        и для картинок созданы уменьшенные копии.
+        """
+        stdout = StringIO()
+        call_command(
+            "warm_caches", pages=1, workers=2, host="testserver",
+            stdout=stdout, stderr=StringIO(),
+        )
+        self.assertIn("с ошибками: 0", stdout.getvalue())
+        thumbnail_lists = KVStore.objects.filter(
+            key__startswith="sorl-thumbnail||thumbnails"
+        )
+        self.assertEqual(thumbnail_lists.count(), 1)
+        Post.objects.create(text="Новый пост после прогрева", author=self.user)
+        for params in ({}, {"page": 1}):
+            with self.subTest(params=params):
+                with self.assertNumQueries(0):
+                    response = self.client.get(reverse("posts:index"), params)
+                self.assertNotContains(response, "Новый пост после прогрева")
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        reverse("posts:index"), params,
+                        HTTP_ACCEPT_ENCODING="gzip, deflate, br",
+                    )
+                self.assertTrue(response.has_header("Content-Encoding"))
+
+    def test_budget_skips_remaining_tasks(self):
+        """Проверяем, что по истечении бюджета задачи не выполняются."""
+        stdout = StringIO()
+        call_command(
+            "warm_caches", budget=0, host="testserver", stdout=stdout
+        )
+        self.assertIn("Выполнено: 0", stdout.getvalue())
+        self.assertFalse(
+            KVStore.objects.filter(key__startswith="sorl-thumbnail||image")
+            .exists()
+        )
@@ -0,0 +1,122 @@
+import logging
+from typing import Iterable, List
+
+from django.conf import settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_thumbnail_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_OPTIONS = {"crop": "center", "upscale": True}
+
+
+def get_thumbnail_geometries() -> List[str]:
+    """Геометрии уменьшенных копий картинки поста по возрастанию ширины."""
+    width, height = settings.POST_IMAGE_SIZE
+    return [
+        f"{variant}x{round(variant * height / width)}"
+        for variant in sorted(settings.POST_IMAGE_WIDTHS)
+    ]
+
+
+def get_responsive_thumbnails(image) -> List:
+    """
+    Возвращает уменьшенные копии картинки для всех ширин из
+    POST_IMAGE_WIDTHS. Ошибки, как и тег thumbnail, не пробрасывает.
+    """
+    if not image:
+        return []
+    try:
+        thumbnails = [
+            get_thumbnail(image, geometry, **THUMBNAIL_OPTIONS)
+            for geometry in get_thumbnail_geometries()
+        ]
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception("Can not make thumbnails for %s", image)
+        return []
+    # Для отсутствующего исходного файла sorl возвращает копии без размера.
+    return [thumbnail for thumbnail in thumbnails if thumbnail.size]
+
+
+def get_thumbnail_store_key(image, geometry: str) -> str:
+    """
+    Ключ уменьшенной копии в хранилище ключ-значение sorl-thumbnail.
+    Повторяет вычисление имени копии из ThumbnailBackend.get_thumbnail.
+    """
+    backend = default.backend
+    source = ImageFile(image)
+    options = dict(THUMBNAIL_OPTIONS)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault("format", backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_thumbnail_settings, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return add_prefix(ImageFile(name, default.storage).key)
+
+
+def _get_many(keys) -> dict:
+    """
+    Читает значения из хранилища sorl-thumbnail одним запросом к кешу и,
+    для промахов, одним запросом к БД.
+    """
+    kvstore_cache = default.kvstore.cache
+    values = {
+        key: value for key, value in kvstore_cache.get_many(keys).items()
+        if isinstance(value, str)
+    }
+    missing = set(keys) - set(values)
+    if missing:
+        stored = dict(
+            KVStore.objects.filter(key__in=missing).values_list("key", "value")
+        )
+        if stored:
+            kvstore_cache.set_many(
+                stored, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+        values.update(stored)
+    return values
+
+
+def prefetch_thumbnails(posts: Iterable) -> None:
+    """
+    Загружает сведения об уменьшенных копиях картинок всех постов страницы
+    одним пакетным запросом и сохраняет их в атрибуте post.thumbnails.
+    Посты, для которых копии еще не созданы, атрибут не получают: тег
+    post_image создаст копии для них обычным способом.
+    """
+    if not isinstance(default.kvstore, cached_db_kvstore.KVStore):
+        return
+    geometries = get_thumbnail_geometries()
+    posts_keys = []
+    for post in posts:
+        if not post.image:
+            continue
+        try:
+            keys = [
+                get_thumbnail_store_key(post.image, geometry)
+                for geometry in geometries
+            ]
+        except Exception:
+            logger.exception("Can not get thumbnail keys for %s", post.image)
+            continue
+        posts_keys.append((post, keys))
+    if not posts_keys:
+        return
+
+    values = _get_many([key for _, keys in posts_keys for key in keys])
+    for post, keys in posts_keys:
+        if all(key in values for key in keys):
+            post.thumbnails = [
+                deserialize_image_file(values[key]) for key in keys
+            ]
@@ -0,0 +1,51 @@
+from collections import defaultdict
+from datetime import timedelta
+from typing import List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Comment, TrendingPost
+
+
+def score_posts(now, window_hours: float, half_life_hours: float,
+                limit: int) -> List[Tuple[int, float]]:
+    """
+    Оценивает посты по комментариям за последние window_hours часов.
+    Вклад комментария уменьшается вдвое каждые half_life_hours часов,
+    поэтому свежие обсуждения поднимаются выше давних. Возвращает до
+    limit пар (id поста, оценка) по убыванию оценки.
+    """
+    since = now - timedelta(hours=window_hours)
+    scores = defaultdict(float)
+    comments = Comment.objects.filter(created__gte=since).values_list(
+        "post_id", "created"
+    )
+    for post_id, created in comments.iterator():
+        age_hours = max((now - created).total_seconds(), 0) / 3600
+        scores[post_id] += 0.5 ** (age_hours / half_life_hours)
+    # При равной оценке выше более новый пост.
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked[:limit]
+
+
+def rebuild_trending(now=None) -> int:
+    """
+    Пересчитывает таблицу TrendingPost. Таблица заменяется целиком в одной
+    транзакции, поэтому лента не видит частично записанный рейтинг.
+    """
+    now = now or timezone.now()
+    ranked = score_posts(
+        now,
+        settings.TRENDING_WINDOW_HOURS,
+        settings.TRENDING_HALF_LIFE_HOURS,
+        settings.TRENDING_SIZE,
+    )
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(post_id=post_id, rank=rank, score=score, computed=now)
+            for rank, (post_id, score) in enumerate(ranked, start=1)
+        )
+    return len(ranked)
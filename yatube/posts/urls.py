@@ -1,20 +1,84 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = "posts"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("new/", views.new_posts, name="new_posts"),
+    path("group/", views.group_index, name="group_index"),
+    path("rss/", feeds.IndexFeed(), name="index_rss"),
+    path("atom/", feeds.IndexAtomFeed(), name="index_atom"),
     path("group/<slug:slug>/", views.group_posts, name="group_list"),
+    path(
+        "group/<slug:slug>/new/", views.new_posts, name="group_new_posts"
+    ),
+    path("group/<slug:slug>/rss/", feeds.GroupFeed(), name="group_rss"),
+    path(
+        "group/<slug:slug>/atom/", feeds.GroupAtomFeed(), name="group_atom"
+    ),
+    path("archive/", views.archive, name="archive"),
+    path("archive/<int:year>/", views.archive, name="archive_year"),
+    path(
+        "archive/<int:year>/<int:month>/",
+        views.archive,
+        name="archive_month"
+    ),
+    path(
+        "group/<slug:slug>/archive/", views.archive, name="group_archive"
+    ),
+    path(
+        "group/<slug:slug>/archive/<int:year>/",
+        views.archive,
+        name="group_archive_year"
+    ),
+    path(
+        "group/<slug:slug>/archive/<int:year>/<int:month>/",
+        views.archive,
+        name="group_archive_month"
+    ),
+    path(
+        "profile/<str:username>/archive/",
+        views.archive,
+        name="profile_archive"
+    ),
+    path(
+        "profile/<str:username>/archive/<int:year>/",
+        views.archive,
+        name="profile_archive_year"
+    ),
+    path(
+        "profile/<str:username>/archive/<int:year>/<int:month>/",
+        views.archive,
+        name="profile_archive_month"
+    ),
     path("profile/<str:username>/", views.profile, name="profile"),
+    path(
+        "profile/<str:username>/new/",
+        views.new_posts,
+        name="profile_new_posts"
+    ),
+    path(
+        "profile/<str:username>/rss/", feeds.AuthorFeed(), name="profile_rss"
+    ),
+    path(
+        "profile/<str:username>/atom/",
+        feeds.AuthorAtomFeed(),
+        name="profile_atom"
+    ),
     path(
         "posts/<int:post_id>/comment/", views.add_comment, name="add_comment"
     ),
     path("posts/<int:post_id>/edit/", views.post_edit, name="post_edit"),
     path("posts/<int:post_id>/", views.post_detail, name="post_detail"),
     path("create/", views.post_create, name="post_create"),
+    path("popular/", views.popular, name="popular"),
     path("follow/", views.follow_index, name="follow_index"),
+    path("follow/new/", views.follow_new_posts, name="follow_new_posts"),
+    path(
+        "notifications/", views.notification_list, name="notifications"
+    ),
     path(
         "profile/<str:username>/follow/",
         views.profile_follow,
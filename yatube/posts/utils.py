@@ -1,12 +1,132 @@
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence, Tuple, Union
+
 from django.core.paginator import Page, Paginator
-from django.db.models import QuerySet
+from django.db.models import Q, QuerySet
 from django.http import HttpRequest
+from django.utils import timezone
+
+KEYSET_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+KEYSET_MAX_MICROSECONDS = (
+    datetime.max.replace(tzinfo=timezone.utc) - KEYSET_EPOCH
+) // timedelta(microseconds=1)
+KEYSET_MAX_PK = 2 ** 63 - 1
+
+
+class ChainedQuerySet:
+    """
+    Несколько querysets подряд как одна последовательность: сначала все
+    строки первого, затем второго и т.д. Поддерживает то, что нужно
+    Paginator и ленте: count(), срезы и filter() для всех частей сразу.
+    Используется для постов из Post и ArchivedPost: архивные посты всегда
+    старше оставшихся в Post.
+    """
+
+    def __init__(self, *querysets: QuerySet):
+        self.querysets = querysets
+        self._counts = None
+
+    def counts(self) -> List[int]:
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return self._counts
+
+    def count(self) -> int:
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def filter(self, *args, **kwargs) -> "ChainedQuerySet":
+        return ChainedQuerySet(*(
+            queryset.filter(*args, **kwargs) for queryset in self.querysets
+        ))
+
+    def __getitem__(self, index: slice) -> List:
+        start, stop = index.start or 0, index.stop
+        rows = []
+        for queryset, count in zip(self.querysets, self.counts()):
+            if stop <= 0:
+                break
+            if start < count:
+                rows.extend(queryset[max(start, 0):min(stop, count)])
+            start -= count
+            stop -= count
+        return rows
 
 
 def get_page_object_from_paginator(
-        posts: QuerySet,
+        posts: Union[QuerySet, ChainedQuerySet],
         posts_per_page: int,
         request: HttpRequest) -> Page:
     paginator = Paginator(posts, posts_per_page)
     page_number = request.GET.get("page")
     return paginator.get_page(page_number)
+
+
+def make_keyset_cursor(post) -> str:
+    """Позиция поста в ленте: микросекунды pub_date и id."""
+    microseconds = (post.pub_date - KEYSET_EPOCH) // timedelta(microseconds=1)
+    return f"{microseconds}.{post.pk}"
+
+
+def parse_keyset_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Разбирает позицию из make_keyset_cursor. Для некорректной позиции,
+    в том числе с датой вне диапазона datetime или id вне диапазона
+    целых чисел базы, возвращает None.
+    """
+    try:
+        microseconds, pk = map(int, cursor.split("."))
+    except ValueError:
+        return None
+    if not (0 <= microseconds <= KEYSET_MAX_MICROSECONDS
+            and 0 < pk <= KEYSET_MAX_PK):
+        return None
+    try:
+        return KEYSET_EPOCH + timedelta(microseconds=microseconds), pk
+    except OverflowError:
+        return None
+
+
+def get_keyset_page(
+        posts: Union[QuerySet, ChainedQuerySet],
+        posts_per_page: int,
+        request: HttpRequest) -> Tuple[List, Optional[str]]:
+    """
+    Страница ленты после позиции из параметра after, без OFFSET и COUNT:
+    запрос идет по индексу (pub_date, id) от новых к старым. Части
+    ChainedQuerySet читаются по очереди, пока страница не заполнится.
+    Возвращает посты и позицию для следующей страницы, если она есть.
+    """
+    parts: Sequence[QuerySet] = getattr(posts, "querysets", (posts,))
+    position = parse_keyset_cursor(request.GET.get("after", ""))
+    page = []
+    for part in parts:
+        if position is not None:
+            pub_date, pk = position
+            part = part.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        page.extend(
+            part.order_by("-pub_date", "-pk")[:posts_per_page + 1 - len(page)]
+        )
+        if len(page) > posts_per_page:
+            break
+    if len(page) > posts_per_page:
+        page = page[:posts_per_page]
+        return page, make_keyset_cursor(page[-1])
+    return page, None
+
+
+def make_excerpt(text: str, length: int) -> Tuple[str, bool]:
+    """
+    Возвращает начало текста не длиннее length символов, обрезанное по
+    границе слова, и признак того, что текст был обрезан.
+    """
+    if len(text) <= length:
+        return text, False
+    excerpt = text[:length]
+    if not text[length].isspace() and " " in excerpt:
+        excerpt = excerpt.rsplit(" ", 1)[0]
+    return excerpt.rstrip(), True
@@ -1,40 +1,70 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
+from django.http import (Http404, HttpResponseBadRequest, HttpResponseRedirect,
+                         JsonResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_cookie
 
+from core.decorators import compress_page
+from core.ratelimit import rate_limit
+
+from . import archive as post_archive
+from . import notifications, polling, queries
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
-from .utils import get_page_object_from_paginator
+from .identity import get_identity_map
+from .models import (ArchivedPost, Follow, Group, Notification, Post,
+                     PostArchiveMonth)
+from .thumbnails import prefetch_thumbnails
+from .utils import (get_keyset_page, get_page_object_from_paginator,
+                    parse_keyset_cursor)
 
 User = get_user_model()
 
 
+def get_follow_suggestions(request):
+    if not request.user.is_authenticated:
+        return []
+    return list(
+        queries.follow_suggestions(request.user)
+        [:settings.FOLLOW_SUGGESTIONS_COUNT]
+    )
+
+
 @cache_page(20)
 @vary_on_cookie
+@compress_page
 def index(request):
-    posts = (Post.objects
-                 .select_related("author")
-                 .all())
+    posts = queries.index_feed()
     page_obj = get_page_object_from_paginator(
         posts, settings.NUMBER_OF_POSTS_PER_PAGE, request
     )
+    prefetch_thumbnails(page_obj)
     context = {
         "page_obj": page_obj,
     }
     return render(request, "posts/index.html", context)
 
 
+def group_index(request):
+    page_obj = get_page_object_from_paginator(
+        queries.group_directory(), settings.NUMBER_OF_GROUPS_PER_PAGE, request
+    )
+    context = {
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/group_index.html", context)
+
+
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related("author").all()
+    group = get_identity_map(request).get_or_404(Group, slug=slug)
+    posts = queries.group_feed(group)
     page_obj = get_page_object_from_paginator(
         posts, settings.NUMBER_OF_POSTS_PER_PAGE, request
     )
+    prefetch_thumbnails(page_obj)
     context = {
         "group": group,
         "page_obj": page_obj,
@@ -43,11 +73,14 @@ def group_posts(request, slug):
 
 
 def profile(request, username):
-    requested_user = get_object_or_404(User, username=username)
-    posts = requested_user.posts.all()
+    requested_user = get_identity_map(request).get_or_404(
+        User, username=username
+    )
+    posts = queries.profile_with_archive(requested_user)
     page_obj = get_page_object_from_paginator(
         posts, settings.NUMBER_OF_POSTS_PER_PAGE, request
     )
+    prefetch_thumbnails(page_obj)
     following = request.user.is_authenticated and Follow.objects.filter(
         user=request.user, author=requested_user
     ).exists()
@@ -55,23 +88,35 @@ def profile(request, username):
         "requested_user": requested_user,
         "page_obj": page_obj,
         "following": following,
+        "suggestions": get_follow_suggestions(request),
     }
     return render(request, "posts/profile.html", context)
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    try:
+        post = get_identity_map(request).get(Post, pk=post_id)
+    except Post.DoesNotExist:
+        # Старые посты перенесены в архивную таблицу с тем же id.
+        post = get_object_or_404(
+            ArchivedPost.objects.select_related("author", "group"),
+            pk=post_id,
+        )
     comment_form = CommentForm()
-    comments = post.comments.select_related("author").all()
+    comments = post.comments.select_related("author").filter(
+        author__is_active=True
+    )
     context = {
         "post": post,
         "comment_form": comment_form,
         "comments": comments,
+        "is_archived": isinstance(post, ArchivedPost),
     }
     return render(request, "posts/post_detail.html", context)
 
 
 @login_required
+@rate_limit("post_create")
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -90,11 +135,14 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    if request.user.pk != post.author.pk:
+    post = get_identity_map(request).get_or_404(Post, pk=post_id)
+    if request.user.pk != post.author_id:
         return HttpResponseRedirect(
             reverse("posts:post_detail", args=(post_id,))
         )
+    # Форма сохраняет все поля поста, поэтому привязывается к строке из
+    # базы, а не к копии из кеша.
+    post = get_object_or_404(Post, pk=post_id)
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
@@ -113,43 +161,191 @@ def post_edit(request, post_id):
 
 
 @login_required
+@rate_limit("add_comment")
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_identity_map(request).get_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        notifications.notify(
+            post.author, request.user, Notification.COMMENT,
+            post=post, comment=comment,
+        )
     return redirect("posts:post_detail", post_id=post_id)
 
 
+def popular(request):
+    posts = queries.trending_feed()
+    page_obj = get_page_object_from_paginator(
+        posts, settings.NUMBER_OF_POSTS_PER_PAGE, request
+    )
+    prefetch_thumbnails(page_obj)
+    context = {
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/popular.html", context)
+
+
+def get_archive_scope(request, slug, username):
+    """
+    Область архива: (область, id, заголовок, лента, имя URL, аргументы URL).
+    """
+    identity_map = get_identity_map(request)
+    if slug is not None:
+        group = identity_map.get_or_404(Group, slug=slug)
+        return (
+            PostArchiveMonth.GROUP, group.pk,
+            f"Архив сообщества {group.title}",
+            queries.group_with_archive(group),
+            "posts:group_archive", (slug,),
+        )
+    if username is not None:
+        author = identity_map.get_or_404(User, username=username)
+        return (
+            PostArchiveMonth.AUTHOR, author.pk,
+            f"Архив постов пользователя {author.get_full_name()}",
+            queries.profile_with_archive(author),
+            "posts:profile_archive", (username,),
+        )
+    return (
+        PostArchiveMonth.SITE, 0, "Архив записей",
+        queries.index_with_archive(), "posts:archive", (),
+    )
+
+
+def archive(request, year=None, month=None, slug=None, username=None):
+    scope, scope_id, title, posts, url_name, url_args = get_archive_scope(
+        request, slug, username
+    )
+    years = {}
+    months = []
+    for counter in post_archive.archive_months(scope, scope_id):
+        years[counter.year] = years.get(counter.year, 0) + counter.post_count
+        if counter.year == year:
+            months.append((
+                counter.month, counter.post_count, reverse(
+                    f"{url_name}_month", args=(*url_args, year, counter.month)
+                ),
+            ))
+    if year is not None and year not in years:
+        raise Http404
+    context = {
+        "title": title,
+        "year": year,
+        "month": month,
+        "years": [
+            (archive_year, count,
+             reverse(f"{url_name}_year", args=(*url_args, archive_year)))
+            for archive_year, count in years.items()
+        ],
+        "months": months,
+    }
+    if month is not None:
+        if month not in {archive_month for archive_month, *_ in months}:
+            raise Http404
+        start, end = post_archive.get_month_range(year, month)
+        context["posts"], context["next_cursor"] = get_keyset_page(
+            posts.filter(pub_date__gte=start, pub_date__lt=end),
+            settings.NUMBER_OF_POSTS_PER_PAGE,
+            request,
+        )
+        prefetch_thumbnails(context["posts"])
+    return render(request, "posts/archive.html", context)
+
+
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = queries.follow_feed(request.user)
     page_obj = get_page_object_from_paginator(
         posts, settings.NUMBER_OF_POSTS_PER_PAGE, request
     )
+    prefetch_thumbnails(page_obj)
     context = {
         "page_obj": page_obj,
+        "suggestions": get_follow_suggestions(request),
     }
     return render(request, "posts/follow.html", context)
 
 
+def new_posts(request, slug=None, username=None):
+    """
+    Число и id постов ленты новее позиции ?since=, которую клиент получил
+    в прошлом ответе или из последнего поста на странице. Рассчитан на
+    частый опрос: обычно отвечает по позиции ленты в кеше без запросов за
+    постами.
+    """
+    cursor = request.GET.get("since", "")
+    since = parse_keyset_cursor(cursor)
+    if since is None:
+        return HttpResponseBadRequest()
+    # Группа или автор ищутся одним запросом, как на их страницах:
+    # неизвестные и удаленные отвечают 404.
+    if slug is not None:
+        group = get_identity_map(request).get_or_404(Group, slug=slug)
+        scope = f"group:{slug}"
+        posts = Post.objects.filter(group=group)
+    elif username is not None:
+        author = get_identity_map(request).get_or_404(
+            User, username=username
+        )
+        scope = f"author:{username}"
+        posts = Post.objects.filter(author=author)
+    else:
+        scope = "site"
+        posts = Post.objects.all()
+    return JsonResponse(polling.poll_feed(scope, posts, since, cursor))
+
+
+@login_required
+def follow_new_posts(request):
+    cursor = request.GET.get("since", "")
+    since = parse_keyset_cursor(cursor)
+    if since is None:
+        return HttpResponseBadRequest()
+    posts = Post.objects.filter(author__following__user=request.user)
+    return JsonResponse(polling.poll_feed(None, posts, since, cursor))
+
+
+@login_required
+def notification_list(request):
+    inbox = (
+        Notification.objects
+        .filter(recipient=request.user, actor__is_active=True)
+        .select_related("actor", "post")
+    )
+    page_obj = get_page_object_from_paginator(
+        inbox, settings.NUMBER_OF_NOTIFICATIONS_PER_PAGE, request
+    )
+    # Страница читается до отметки, чтобы новые уведомления на ней были
+    # выделены.
+    page_obj.object_list = list(page_obj.object_list)
+    notifications.mark_all_read(request.user.pk)
+    context = {
+        "page_obj": page_obj,
+    }
+    return render(request, "posts/notifications.html", context)
+
+
 @login_required
+@rate_limit("profile_follow", methods=None)
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_identity_map(request).get_or_404(User, username=username)
     if request.user != author:
-        Follow.objects.get_or_create(
+        _, created = Follow.objects.get_or_create(
             user=request.user,
             author=author,
         )
+        if created:
+            notifications.notify(author, request.user, Notification.FOLLOW)
     return redirect("posts:profile", username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_identity_map(request).get_or_404(User, username=username)
     is_follow_exists = Follow.objects.filter(
         user=request.user, author=author
     ).exists()
@@ -0,0 +1,83 @@
+"""
+Production settings for yatube project.
+
+Use with DJANGO_SETTINGS_MODULE=yatube.production_settings. Everything not
+overridden here comes from yatube.settings.
+
+Measure cold start with `manage.py bench_startup --settings-module
+yatube.production_settings`. Most of the import time is Django itself:
+Django 2.2 imports distutils, which setuptools replaces with its own copy
+unless SETUPTOOLS_USE_DISTUTILS=stdlib is set in the worker environment.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, INSTALLED_APPS, MIDDLEWARE, TEMPLATES
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)  # noqa: F405
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    host for host in ALLOWED_HOSTS if host != 'testserver'  # noqa: F405
+]
+
+# Debug-only apps are not installed, so their modules (debug_toolbar pulls
+# in its panels and sqlparse) are never imported by the workers.
+DEBUG_APPS = ('debug_toolbar',)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEBUG_APPS]
+
+MIDDLEWARE = [
+    middleware for middleware in MIDDLEWARE
+    if middleware.split('.')[0] not in DEBUG_APPS
+]
+
+# Templates are compiled once per process instead of on every render.
+TEMPLATES = [
+    {
+        **TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            **TEMPLATES[0]['OPTIONS'],
+            'context_processors': [
+                processor
+                for processor in TEMPLATES[0]['OPTIONS']['context_processors']
+                if processor != 'django.template.context_processors.debug'
+            ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+        },
+    },
+]
+
+# Keep database connections open between requests.
+DATABASES = {
+    alias: {**database, 'CONN_MAX_AGE': 600}
+    for alias, database in DATABASES.items()
+}
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+# Feed heads and versions, unread notification counters, cached posts and
+# rate limit buckets are updated or dropped on write by the worker that
+# handled the write, so all workers must share one cache: with the
+# per-process LocMemCache other workers keep serving stale values until
+# the keys expire. The database cache needs no extra service (create its
+# table once with `manage.py createcachetable`); point
+# DJANGO_CACHE_BACKEND and DJANGO_CACHE_LOCATION at memcached to use it
+# instead.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'DJANGO_CACHE_BACKEND',
+            'django.core.cache.backends.db.DatabaseCache',
+        ),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', 'yatube_cache'),
+    },
+}
@@ -54,10 +54,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.PrecompressedStaticMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -77,6 +79,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
@@ -136,13 +139,52 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Hashed static files are served by core.middleware with this max-age.
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+# Dynamic response compression, see core.middleware.CompressionMiddleware.
+# Brotli is used when the optional Brotli package is installed.
+
+COMPRESSIBLE_CONTENT_TYPES = (
+    'text/html',
+    'application/json',
+    'application/rss+xml',
+    'application/atom+xml',
+)
+
+COMPRESSION_MIN_SIZE = 512
+
+COMPRESSION_GZIP_LEVEL = 6
+
+COMPRESSION_BROTLI_QUALITY = 5
+
+if not DEBUG:
+    # collectstatic writes hashed names plus .gz/.br variants (.br needs
+    # the optional Brotli package).
+    STATICFILES_STORAGE = (
+        'core.storage.CompressedManifestStaticFilesStorage'
+    )
+
+# Sessions are read from the cache and written through to the database;
+# the session user is cached for AUTH_USER_CACHE_TIMEOUT seconds by
+# core.middleware.CachedAuthenticationMiddleware.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTH_USER_CACHE_TIMEOUT = 60
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
 
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Mail is queued in core.models.OutboxMessage during the request and sent
+# in batches by `manage.py send_queued_mail` through OUTBOX_EMAIL_BACKEND.
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+
+OUTBOX_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_mails')
 
@@ -150,12 +192,107 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_mails')
 
 NUMBER_OF_POSTS_PER_PAGE: int = 10
 
+NUMBER_OF_GROUPS_PER_PAGE: int = 50
+
+# The group directory is cached until a post or a group changes.
+GROUP_DIRECTORY_CACHE_TIMEOUT = 60 * 60
+
+# Post images are cropped to POST_IMAGE_SIZE proportions and rendered with
+# a srcset of thumbnails for every width in POST_IMAGE_WIDTHS.
+POST_IMAGE_SIZE = (960, 339)
+
+POST_IMAGE_WIDTHS = (360, 640, 960)
+
+POST_IMAGE_SIZES_ATTRIBUTE = '(max-width: 960px) 100vw, 960px'
+
+# Length of the stored post excerpt rendered in feeds instead of full text.
+# Run `manage.py backfill_post_excerpts` after changing it.
+POST_EXCERPT_LENGTH: int = 300
+
+# The "Popular" feed reads posts.models.TrendingPost, rebuilt periodically by
+# `manage.py compute_trending`: comments from the last TRENDING_WINDOW_HOURS
+# hours count, each one's weight halving every TRENDING_HALF_LIFE_HOURS.
+TRENDING_WINDOW_HOURS = 48
+
+TRENDING_HALF_LIFE_HOURS = 6
+
+TRENDING_SIZE = 100
+
+# Follow suggestions stored per user by `manage.py compute_follow_suggestions`
+# (needs numpy and scipy) and shown on the profile and follow pages.
+FOLLOW_SUGGESTIONS_COUNT = 5
+
+# "New posts since" polling endpoints return at most NEW_POSTS_LIMIT ids.
+# The newest post position of each feed is cached for FEED_HEAD_TIMEOUT
+# seconds and moved forward by posts.signals when a post is created.
+NEW_POSTS_LIMIT = 100
+
+FEED_HEAD_TIMEOUT = 60 * 60
+
+# Deleting a post, group or user in the admin only hides it; `manage.py
+# purge_deleted` removes or detaches the dependent rows PURGE_BATCH_SIZE at
+# a time, one transaction per batch, sleeping PURGE_PAUSE seconds between
+# batches so the site can write in between.
+PURGE_BATCH_SIZE = 500
+
+PURGE_PAUSE = 0.05
+
+# `manage.py archive_old_posts` moves posts older than POST_COLD_AFTER_DAYS
+# and their comments into the ArchivedPost/ArchivedComment tables. Post
+# pages, profiles and archive pages read both tables.
+POST_COLD_AFTER_DAYS = 365
+
+# Posts opened by id (post page, edit, comments) are cached with their
+# author and group for POST_CACHE_TIMEOUT seconds and dropped on save or
+# delete; ids without a visible post are cached for POST_CACHE_MISS_TIMEOUT.
+POST_CACHE_TIMEOUT = 60 * 5
+
+POST_CACHE_MISS_TIMEOUT = 30
+
+# Notifications about new comments and followers. The unread counter shown
+# in the header lives in the cache and is recounted after it expires.
+NUMBER_OF_NOTIFICATIONS_PER_PAGE: int = 20
+
+NOTIFICATION_COUNT_TIMEOUT = 60 * 60 * 24
+
+# RSS/Atom feeds (posts.feeds) list the latest FEED_SIZE posts. Bodies are
+# cached under the feed version, which changes whenever one of its posts
+# is saved or deleted.
+FEED_SIZE = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Sitemaps written by `manage.py generate_sitemaps` into SITEMAP_ROOT: the
+# sitemap.xml index and shards of at most SITEMAP_SHARD_SIZE URLs. Only
+# shards whose rows changed are rewritten. Served at the site root by
+# core.views.serve_sitemap or directly by the front proxy.
+SITEMAP_ROOT = os.path.join(BASE_DIR, 'sitemaps')
+
+SITEMAP_BASE_URL = 'https://alexanderup.pythonanywhere.com'
+
+SITEMAP_SHARD_SIZE = 50000
+
+SITEMAP_MAX_AGE = 60 * 60
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# How core.views.serve_media delivers files from MEDIA_ROOT:
+# 'python' - streamed by the app (sendfile via wsgi.file_wrapper, Range
+# and ETag support); 'x-accel-redirect' - handed off to nginx through an
+# internal location; 'x-sendfile' - handed off to Apache/lighttpd.
+MEDIA_DELIVERY = 'python'
+
+MEDIA_ACCEL_REDIRECT_LOCATION = '/protected-media/'
+
+MEDIA_MAX_AGE = 60 * 60 * 24
+
+# LocMemCache is per process and fits only a single-process development
+# server: invalidation on write reaches only the process that handled the
+# write. yatube.production_settings switches to a shared cache.
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
@@ -165,6 +302,34 @@ CACHES = {
     }
 }
 
+# Token bucket limits for write endpoints: "capacity" is the allowed burst,
+# "refill_per_second" is the sustained rate. Per-user and per-IP buckets
+# are checked independently, see core.ratelimit.
+
+RATE_LIMIT_ENABLED = True
+
+# META key of the header with the client address set by the front proxy,
+# e.g. 'HTTP_X_REAL_IP' for nginx with `proxy_set_header X-Real-IP
+# $remote_addr`. Without it the per-IP buckets use REMOTE_ADDR, which
+# behind a proxy is the proxy's address for every client. Only set it when
+# the proxy always overwrites the header.
+RATE_LIMIT_CLIENT_IP_HEADER = None
+
+RATE_LIMITS = {
+    "post_create": {
+        "user": {"capacity": 5, "refill_per_second": 0.1},
+        "ip": {"capacity": 50, "refill_per_second": 1},
+    },
+    "add_comment": {
+        "user": {"capacity": 10, "refill_per_second": 0.2},
+        "ip": {"capacity": 100, "refill_per_second": 2},
+    },
+    "profile_follow": {
+        "user": {"capacity": 20, "refill_per_second": 0.5},
+        "ip": {"capacity": 100, "refill_per_second": 2},
+    },
+}
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
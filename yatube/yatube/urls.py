@@ -13,13 +13,28 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_media, serve_sitemap
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    re_path(
+        r"^{}(?P<path>.+)$".format(
+            re.escape(settings.MEDIA_URL.lstrip("/"))
+        ),
+        serve_media,
+        name="media",
+    ),
+    # Карта сайта лежит в корне: sitemap может перечислять только адреса
+    # ниже своего каталога.
+    re_path(
+        r"^(?P<path>sitemap(-[\w-]+)?\.xml)$", serve_sitemap, name="sitemap"
+    ),
     path("about/", include("about.urls", namespace="about")),
     path("auth/", include("users.urls", namespace="users")),
     path("auth/", include("django.contrib.auth.urls")),
@@ -32,7 +47,4 @@ handler403 = "core.views.permission_denied"
 
 if settings.DEBUG:
     import debug_toolbar
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)